@@ -0,0 +1,140 @@
+import json
+import multiprocessing
+import random
+import sys
+from collections import Counter
+
+import degrees
+from batch import load_worker
+
+# Seed for choosing sampled people, fixed so an interrupted run resumes on the same sample
+SEED = 0
+
+# Number of most central people to report
+TOP = 10
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python analytics.py directory checkpoint.jsonl [sample]")
+    directory = sys.argv[1]
+    checkpoint = sys.argv[2]
+    sample = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    # Load data from files into memory
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    sources = choose_sources(sample)
+    summaries = run(directory, sources, checkpoint)
+    report = combine(summaries)
+
+    print(f"Searched from {report['sources']} people.")
+    print("Degrees of separation:")
+    for depth, count in sorted(report["histogram"].items()):
+        print(f"  {depth}: {count}")
+    print(f"Mean degrees of separation: {report['mean']:.4f}")
+    print(f"Estimated diameter: {report['diameter']}")
+    print("Most central people:")
+    for person_id, closeness in report["central"]:
+        name = degrees.people[person_id]["name"]
+        print(f"  {name} ({person_id}): {closeness:.4f}")
+
+
+def choose_sources(sample=None):
+    """
+    Return the person_ids to search from: everyone, or a seeded
+    random sample of `sample` people.
+    """
+    if sample is None or sample >= len(degrees.person_ids):
+        return list(degrees.person_ids)
+    return random.Random(SEED).sample(degrees.person_ids, sample)
+
+
+def run(directory, sources, checkpoint, processes=None):
+    """
+    Return a summary of the search from every person_id in `sources`.
+
+    Summaries are appended to the JSON lines file `checkpoint` as they
+    complete, and sources already recorded there are not searched again.
+    """
+    summaries = read_checkpoint(checkpoint)
+    remaining = [source for source in sources if source not in summaries]
+
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        with multiprocessing.Pool(processes, initializer=load_worker, initargs=(directory,)) as pool:
+            for summary in pool.imap_unordered(summarize, remaining):
+                summaries[summary["person_id"]] = summary
+                f.write(json.dumps(summary) + "\n")
+                f.flush()
+
+    return {source: summaries[source] for source in sources}
+
+
+def read_checkpoint(checkpoint):
+    """
+    Return the summaries recorded in `checkpoint`, keyed by person_id,
+    ignoring a final line left incomplete by an interrupted run.
+    """
+    summaries = {}
+    try:
+        with open(checkpoint, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    summary = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                summaries[summary["person_id"]] = summary
+    except FileNotFoundError:
+        pass
+    return summaries
+
+
+def summarize(person_id):
+    """
+    Search from one person and return their distance histogram,
+    eccentricity and harmonic closeness.
+    """
+    distances = degrees.distances_from(degrees.person_index[person_id])
+    counts = Counter(distances)
+    del counts[-1]
+    del counts[0]
+
+    # Harmonic closeness stays meaningful when parts of the graph are unreachable
+    others = len(degrees.person_ids) - 1
+    closeness = sum(count / depth for depth, count in counts.items())
+    return {
+        "person_id": person_id,
+        "histogram": {str(depth): count for depth, count in counts.items()},
+        "eccentricity": max(counts, default=0),
+        "closeness": closeness / others if others else 0
+    }
+
+
+def combine(summaries):
+    """
+    Combine per-person summaries into an overall histogram of degrees of
+    separation, its mean, an estimated diameter and the most central people.
+    """
+    histogram = Counter()
+    for summary in summaries.values():
+        for depth, count in summary["histogram"].items():
+            histogram[int(depth)] += count
+
+    pairs = sum(histogram.values())
+    central = sorted(
+        ((summary["closeness"], person_id) for person_id, summary in summaries.items()),
+        reverse=True
+    )[:TOP]
+    return {
+        "sources": len(summaries),
+        "histogram": dict(histogram),
+        "mean": sum(depth * count for depth, count in histogram.items()) / pairs if pairs else 0,
+        "diameter": max((summary["eccentricity"] for summary in summaries.values()), default=0),
+        "central": [(person_id, closeness) for closeness, person_id in central]
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import csv
+import json
+import multiprocessing
+import sys
+
+import degrees
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python batch.py directory pairs.csv [output.jsonl]")
+    directory = sys.argv[1]
+
+    # Load data from files into memory
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    pairs = load_pairs(sys.argv[2])
+    records = solve_pairs(directory, pairs)
+
+    if len(sys.argv) == 4:
+        with open(sys.argv[3], "w", encoding="utf-8") as f:
+            write_records(records, f)
+    else:
+        write_records(records, sys.stdout)
+
+
+def load_pairs(filename):
+    """
+    Load (source, target) name pairs from a CSV file with columns source, target.
+    """
+    with open(filename, encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return [(row["source"], row["target"]) for row in reader]
+
+
+def solve_pairs(directory, pairs, processes=None):
+    """
+    Return one result record per (source, target) name pair, in input order.
+
+    Pairs that share a source are answered from a single search tree,
+    and the groups of pairs are spread over a pool of worker processes
+    that load their data from `directory`.
+    """
+    records = [None] * len(pairs)
+
+    # Group the pairs by source person, recording names that cannot be resolved
+    groups = {}
+    for i, (source_name, target_name) in enumerate(pairs):
+        source, error = resolve(source_name)
+        unresolved = source_name
+        if error is None:
+            target, error = resolve(target_name)
+            unresolved = target_name
+        if error is not None:
+            records[i] = {
+                "source": source_name,
+                "target": target_name,
+                "error": error,
+                "candidates": candidates(unresolved)
+            }
+            continue
+        groups.setdefault(source, {}).setdefault(target, []).append(i)
+
+    tasks = [(source, list(targets)) for source, targets in groups.items()]
+    with multiprocessing.Pool(processes, initializer=load_worker, initargs=(directory,)) as pool:
+        for source, paths in pool.imap_unordered(solve_group, tasks):
+            for target, path in paths.items():
+                for i in groups[source][target]:
+                    source_name, target_name = pairs[i]
+                    records[i] = result_record(source_name, target_name, path)
+
+    return records
+
+
+def resolve(name):
+    """
+    Return (person_id, None) for a name matching exactly one person,
+    or (None, error message) if it matches none or several people.
+    """
+    person_ids = degrees.names.get(name.lower(), set())
+    if len(person_ids) == 0:
+        return None, "Person not found."
+    elif len(person_ids) > 1:
+        return None, "Ambiguous name."
+    return next(iter(person_ids)), None
+
+
+def candidates(name):
+    """
+    Return the people whose names best match `name`, for names that cannot be resolved.
+    """
+    return [
+        {"person_id": person_id, **degrees.people[person_id]}
+        for person_id in degrees.search_names(name)
+    ]
+
+
+def load_worker(directory):
+    """
+    Load data in a worker process, unless it was inherited from the parent.
+    """
+    if not degrees.people:
+        degrees.load_data(directory)
+
+
+def solve_group(task):
+    """
+    Return the source and a dictionary of paths to each of its targets.
+    """
+    source, targets = task
+
+    # A lone target is found faster by searching from both ends
+    if len(targets) == 1:
+        return source, {targets[0]: degrees.shortest_path(source, targets[0])}
+    return source, degrees.shortest_paths(source, targets)
+
+
+def result_record(source_name, target_name, path):
+    """
+    Return the JSON-serialisable result record for one pair.
+    """
+    record = {"source": source_name, "target": target_name}
+    if path is None:
+        record["degrees"] = None
+        record["path"] = None
+    else:
+        record["degrees"] = len(path)
+        record["path"] = [
+            {"movie_id": movie_id, "person_id": person_id}
+            for movie_id, person_id in path
+        ]
+    return record
+
+
+def write_records(records, f):
+    """
+    Write records to the file object `f` as JSON lines.
+    """
+    for record in records:
+        f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
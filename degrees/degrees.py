@@ -1,55 +1,394 @@
 import csv
+import heapq
+import os
+import pickle
 import sys
-
-from util import Node, StackFrontier, QueueFrontier
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from util import Node, StackFrontier, QueueFrontier, Strings, Index, Groups, Records
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Dense integer indexes assigned at load time: person_ids[i] is the person_id of
+# person i and person_index maps it back, by binary search over person_order, the
+# person indexes sorted by person_id, and likewise for movies
+person_ids = Strings()
+person_order = array("i")
+person_index = Index(person_ids, person_order)
+movie_ids = Strings()
+movie_order = array("i")
+movie_index = Index(movie_ids, movie_order)
+
+# Fields of person i and movie j, stored a column at a time
+person_names = Strings()
+person_births = Strings()
+movie_titles = Strings()
+movie_years = Strings()
+
+# Compressed sparse row adjacency over the integer indexes: the movies of person i are
+# person_movies[person_offsets[i]:person_offsets[i + 1]], and the stars of movie j are
+# movie_people[movie_offsets[j]:movie_offsets[j + 1]]
+person_offsets = array("l")
+person_movies = array("i")
+movie_offsets = array("l")
+movie_people = array("i")
+
+# Name search index: name_keys is the sorted list of lowercased names, the people
+# named name_keys[k] are name_people[name_offsets[k]:name_offsets[k + 1]], and
+# name_trigrams maps each trigram to an array of positions in name_keys
+name_keys = Strings()
+name_offsets = array("l")
+name_people = array("i")
+name_trigrams = {}
 
 # Maps names to a set of corresponding person_ids
-names = {}
+names = Groups(name_keys, name_offsets, name_people, person_ids)
+
+# Maps person_ids to a dictionary of: name, birth
+people = Records(person_index, name=person_names, birth=person_births)
+
+# Maps movie_ids to a dictionary of: title, year
+movies = Records(movie_index, title=movie_titles, year=movie_years)
+
+# Number of names compared in full by a fuzzy name search
+FUZZY_CANDIDATES = 50
+
+# Most positions counted by a fuzzy name search: trigrams shared by very many
+# names say little about which one was meant, and counting them dominated it
+FUZZY_POSTINGS = 20000
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+# Binary snapshot of the loaded data, written next to the CSV files and reused
+# while their sizes and modification times are unchanged
+SNAPSHOT_FILE = "degrees.snapshot"
+SNAPSHOT_VERSION = 4
+SOURCE_FILES = ("people.csv", "movies.csv", "stars.csv")
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+# Landmark index: breadth-first distances from a few well-connected people, stored one
+# byte per person, which bound the degrees of separation before any search is made
+LANDMARK_FILE = "degrees.landmarks"
+LANDMARKS = 16
+UNREACHABLE = 255
 
+# Person indexes of the landmarks, and for each an array of distances to every person
+landmarks = []
+landmark_distances = []
 
-def load_data(directory):
+
+def load_data(directory, years=None, min_cast=None):
     """
-    Load data from CSV files into memory.
+    Load data from CSV files into memory, reusing the snapshot
+    from an earlier load if the CSV files have not changed since,
+    along with the landmark index if one was saved for them.
+
+    `years` and `min_cast` are passed on to load_csv. Returns the
+    loading statistics from load_csv, or None if the snapshot was used.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    key = snapshot_key(directory, years, min_cast)
+    stats = None
+    if not load_snapshot(directory, key):
+        stats = load_csv(directory, years, min_cast)
+        save_snapshot(directory, key)
+    load_landmarks(directory, key)
+    return stats
+
+
+def load_csv(directory, years=None, min_cast=None):
+    """
+    Load data from CSV files into memory, streaming each file one row at a time.
+
+    If `years` is a (first, last) pair, only movies released in those years
+    are kept, and if `min_cast` is given, only movies with at least that many
+    stars. When filtering, only people who starred in a kept movie are kept.
+
+    Returns a dictionary of the rows read, seconds taken, rows per second
+    and peak memory of the process in bytes (None where unavailable).
+    """
+    start = time.perf_counter()
+    rows = 0
+    filtering = years is not None or min_cast is not None
+
+    # Rows are collected in lists and dictionaries while reading, and packed once all are read
+    found_movies = []
+    found_movie_index = {}
+    movie_rows = {}
+    found_people = []
+    found_person_index = {}
+    person_rows = {}
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    for row in read_csv(f"{directory}/movies.csv", "id", "title", "year"):
+        rows += 1
+        movie_id, title, year = row
+        if years is not None and not (year.isdigit() and years[0] <= int(year) <= years[1]):
+            continue
+        if movie_id not in movie_rows:
+            found_movie_index[movie_id] = len(found_movies)
+            found_movies.append(movie_id)
+        movie_rows[movie_id] = (title, year)
+
+    # Load stars as parallel arrays of person and movie indexes, giving
+    # people indexes in the order they first appear, and count each cast
+    star_people = array("i")
+    star_movies = array("i")
+    cast = array("l", [0]) * len(found_movies)
+    for row in read_csv(f"{directory}/stars.csv", "person_id", "movie_id"):
+        rows += 1
+        person_id, movie_id = row
+        movie = found_movie_index.get(movie_id)
+        if movie is None:
+            continue
+        person = found_person_index.get(person_id)
+        if person is None:
+            person = found_person_index[person_id] = len(found_people)
+            found_people.append(person_id)
+        star_people.append(person)
+        star_movies.append(movie)
+        cast[movie] += 1
+
+    # Load people who starred in a kept movie, and everyone else when not filtering
+    for row in read_csv(f"{directory}/people.csv", "id", "name", "birth"):
+        rows += 1
+        person_id, name, birth = row
+        if person_id not in found_person_index:
+            if filtering:
+                continue
+            found_person_index[person_id] = len(found_people)
+            found_people.append(person_id)
+        person_rows[person_id] = (name, birth)
+
+    # Drop stars of people missing from people.csv and of movies with too small a cast
+    keep_movies = bytearray(min_cast is None or size >= min_cast for size in cast)
+    keep_people = bytearray(person_id in person_rows for person_id in found_people)
+
+    # When filtering, people are only kept if they starred in a movie that is kept
+    if filtering:
+        starred = bytearray(len(found_people))
+        for person, movie in zip(star_people, star_movies):
+            if keep_movies[movie]:
+                starred[person] = 1
+        for person in range(len(found_people)):
+            keep_people[person] &= starred[person]
+    star_people, star_movies = renumber(star_people, star_movies, keep_people, keep_movies)
+
+    found_people = [person_id for person_id, keep in zip(found_people, keep_people) if keep]
+    found_movies = [movie_id for movie_id, keep in zip(found_movies, keep_movies) if keep]
+    store_records(person_ids, person_order, [person_names, person_births], found_people, person_rows)
+    store_records(movie_ids, movie_order, [movie_titles, movie_years], found_movies, movie_rows)
+
+    build_adjacency(star_people, star_movies)
+    build_name_index()
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else None,
+        "peak_memory": peak_memory()
+    }
+
+
+def store_records(ids, order, fields, kept_ids, rows):
+    """
+    Pack `kept_ids` into `ids`, their positions sorted by id into the array
+    `order`, and each column of their `rows` into the matching Strings of `fields`.
+    """
+    ids.replace(kept_ids)
+    order[:] = array("i", sorted(range(len(kept_ids)), key=kept_ids.__getitem__))
+    for column, values in enumerate(fields):
+        values.replace(rows[kept_id][column] for kept_id in kept_ids)
+
+
+def read_csv(filename, *columns):
+    """
+    Yield the given columns of each row of a CSV file with a header,
+    as lists, without building a dictionary per row.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = [header.index(column) for column in columns]
         for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+            yield [row[position] for position in positions]
+
+
+def renumber(star_people, star_movies, keep_people, keep_movies):
+    """
+    Return the star arrays with the stars of people and movies not marked in
+    `keep_people` and `keep_movies` dropped, and the rest renumbered to count
+    only the people and movies that are kept.
+    """
+    if all(keep_people) and all(keep_movies):
+        return star_people, star_movies
+
+    person_remap = remap(keep_people)
+    movie_remap = remap(keep_movies)
+    kept_people = array("i")
+    kept_movies = array("i")
+    for person, movie in zip(star_people, star_movies):
+        if person_remap[person] != -1 and movie_remap[movie] != -1:
+            kept_people.append(person_remap[person])
+            kept_movies.append(movie_remap[movie])
+    return kept_people, kept_movies
+
+
+def remap(keep):
+    """
+    Return an array mapping each index to its position among the indexes
+    marked in `keep`, or to -1 for those that are not.
+    """
+    mapping = array("i", [-1]) * len(keep)
+    kept = 0
+    for old, marked in enumerate(keep):
+        if marked:
+            mapping[old] = kept
+            kept += 1
+    return mapping
+
+
+def peak_memory():
+    """
+    Return the peak resident memory of this process in bytes,
+    or None on platforms without the resource module.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def snapshot_key(directory, years=None, min_cast=None):
+    """
+    Return the (version, files, filters) key identifying the current
+    contents of the CSV files in `directory` and how they were filtered.
+    """
+    files = []
+    for filename in SOURCE_FILES:
+        stat = os.stat(os.path.join(directory, filename))
+        files.append((filename, stat.st_size, stat.st_mtime_ns))
+    return (SNAPSHOT_VERSION, tuple(files), years and tuple(years), min_cast)
+
+
+def load_snapshot(directory, key):
+    """
+    Load data from the snapshot in `directory` if it exists and matches `key`.
+    Return True if the data was loaded.
+    """
+    # The key is stored ahead of the data, so a stale snapshot is never read in full
+    try:
+        with open(os.path.join(directory, SNAPSHOT_FILE), "rb") as f:
+            if pickle.load(f) != key:
+                return False
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return False
+
+    # Every part is one string or array, so loading creates no object per person or movie
+    for strings, name in snapshot_strings():
+        strings.replace(snapshot[name])
+    for values, name in snapshot_arrays():
+        values[:] = snapshot[name]
+    name_trigrams.update(snapshot["name_trigrams"])
+    return True
+
+
+def save_snapshot(directory, key):
+    """
+    Write the loaded data to a snapshot in `directory`, tagged with `key`.
+    A directory that cannot be written to is left without a snapshot.
+    """
+    snapshot = {"name_trigrams": name_trigrams}
+    for values, name in snapshot_strings() + snapshot_arrays():
+        snapshot[name] = values
+
+    # Write to a temporary file first so a concurrent reader never sees half a snapshot
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def snapshot_strings():
+    """
+    Return (Strings, name) pairs for every packed column in the snapshot.
+    """
+    return [
+        (person_ids, "person_ids"),
+        (person_names, "person_names"),
+        (person_births, "person_births"),
+        (movie_ids, "movie_ids"),
+        (movie_titles, "movie_titles"),
+        (movie_years, "movie_years"),
+        (name_keys, "name_keys")
+    ]
+
+
+def snapshot_arrays():
+    """
+    Return (array, name) pairs for every array in the snapshot.
+    """
+    return [
+        (person_order, "person_order"),
+        (movie_order, "movie_order"),
+        (person_offsets, "person_offsets"),
+        (person_movies, "person_movies"),
+        (movie_offsets, "movie_offsets"),
+        (movie_people, "movie_people"),
+        (name_offsets, "name_offsets"),
+        (name_people, "name_people")
+    ]
+
+
+def build_adjacency(star_people, star_movies):
+    """
+    Build the person -> movie and movie -> person CSR arrays
+    from parallel arrays of (person, movie) index pairs.
+    """
+    fill_csr(person_offsets, person_movies, star_people, star_movies, len(person_ids))
+    fill_csr(movie_offsets, movie_people, star_movies, star_people, len(movie_ids))
+
+
+def fill_csr(offsets, targets, rows, columns, size):
+    """
+    Replace the contents of `offsets` and `targets` with a CSR layout
+    of `size` rows, where rows[k] is linked to columns[k].
+    """
+    # Count the entries of each row, then turn the counts into start offsets
+    counts = array("l", [0]) * (size + 1)
+    for row in rows:
+        counts[row + 1] += 1
+    for i in range(size):
+        counts[i + 1] += counts[i]
+
+    # Place every column at the next free slot of its row
+    position = array("l", counts)
+    filled = array("i", [0]) * len(rows)
+    for row, column in zip(rows, columns):
+        filled[position[row]] = column
+        position[row] += 1
+
+    offsets[:] = counts
+    targets[:] = filled
 
 
 def main():
@@ -59,8 +398,12 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    stats = load_data(directory)
     print("Data loaded.")
+    if stats is not None:
+        print(f"Read {stats['rows']} rows in {stats['seconds']:.1f}s ({stats['rows_per_second']:.0f} rows/s).")
+        if stats["peak_memory"] is not None:
+            print(f"Peak memory: {stats['peak_memory'] / 2 ** 20:.1f} MB.")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -84,27 +427,29 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=True):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    By default the search expands from both the source and the target;
+    pass bidirectional=False to grow a single frontier from the source.
+
     If no possible path, returns None.
     """
+    if bidirectional:
+        return bidirectional_path(source, target)
 
-    # About the nodes: states are people (person_id), actions are movies where the person has starred.
-    # Our initial state and goal state are defined by the two people we’re trying to connect. 
+    # About the nodes: states are person indexes, actions are movie indexes where the person has starred.
+    # Our initial state and goal state are defined by the two people we’re trying to connect.
+    source = person_index[source]
+    target = person_index[target]
+    if source == target:
+        return []
 
-    # A list of movies where the source has starred
-    movies = people[source]["movies"]
-
-    # Initialize frontier
-    frontier = QueueFrontier()
-
-    # Because one person has starred in many movies, we loop over the movies and add each as a separate node to the frontier
-    for movie in movies:
-        source_node = Node(state=source, parent=None, action=movie)
-        frontier.add(source_node)
+    # Initialize frontier, which tests for the target as each node is generated
+    frontier = QueueFrontier(goal=target)
+    frontier.add(Node(state=source, parent=None, action=None))
 
     # Initialize an empty explored set
     explored = set()
@@ -116,39 +461,391 @@ def shortest_path(source, target):
         if frontier.empty():
             return None
 
-        # Choose a node from the frontier
+        # Choose a node from the frontier and mark it as explored
         node = frontier.remove()
-
-        # See if any neighbors of the node are the target
-        # Neighbors is a list of (movie_id, person_id) pairs for people who starred with a given person
-        neighbors = neighbors_for_person(node.state)
-
-        for movie_id, person_id in neighbors:
-            if person_id == target:
-                # Target is found, create the path
-                # Path is a list where each list item is the next (movie_id, person_id) pair
-                # in the path from the source to the target.
-                path = []
-                last_path_item = (movie_id, person_id)
-                while node.parent is not None:
-                    item = (node.action, node.state)
-                    print(item)
-                    node = node.parent
-                    path.append(item)
-                path.reverse()
-                path.append(last_path_item)
-                return path
-
-        # Mark node as explored
         explored.add(node.state)
 
-        # Add neighbors to frontier
-        for action, state in neighbors:
+        # Add neighbors to frontier, stopping as soon as one of them is the target
+        for action, state in neighbor_indexes(node.state):
             if not frontier.contains_state(state) and state not in explored:
-                child = Node(state=state, parent=node, action=action)
-                frontier.add(child)
+                frontier.add(Node(state=state, parent=node, action=action))
+                if frontier.solution is not None:
+                    return path_to(frontier.solution)
+
+
+def path_to(node):
+    """
+    Returns the list of (movie_id, person_id) pairs
+    leading from the root of `node`'s search tree to `node`.
+    """
+    path = []
+    while node.parent is not None:
+        path.append((movie_ids[node.action], person_ids[node.state]))
+        node = node.parent
+    path.reverse()
+    return path
+
+
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends and always growing the smaller frontier.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    source = person_index[source]
+    target = person_index[target]
+
+    # The landmark index can show the two are not connected without searching at all,
+    # and when its bounds meet, the path through the best landmark is a shortest one
+    bounds = landmark_bounds(source, target)
+    if bounds is None:
+        return None
+    lower, upper = bounds
+    if upper is not None and lower == upper:
+        return landmark_path(source, target)
+
+    # Each side maps the person indexes it has reached to the (movie, person) step
+    # that reached them (None for the starting person) and to their distance,
+    # and remembers which movies it has already expanded
+    forward_parents = {source: None}
+    backward_parents = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_movies = set()
+    backward_movies = set()
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    # Once either side runs out of people to expand, the two can never meet
+    while forward_frontier and backward_frontier:
+
+        # Expand one full level of whichever frontier is currently smaller
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_level(
+                forward_frontier, forward_parents, forward_depth, forward_movies, backward_depth,
+                target, upper
+            )
+        else:
+            backward_frontier, meeting = expand_level(
+                backward_frontier, backward_parents, backward_depth, backward_movies, forward_depth,
+                source, upper
+            )
+
+        if meeting is not None:
+            return join_paths(meeting, forward_parents, backward_parents)
+
+    return None
+
+
+def expand_level(frontier, parents, depth, expanded_movies, other_depth, goal, upper=None):
+    """
+    Expands every person index in `frontier` by one step, recording parents
+    and depths for newly reached people.
+
+    If `upper` bounds the length of the path, people the landmark index
+    shows to be too far from `goal` are not expanded.
+
+    Returns the next frontier and the person where this side met the
+    other one on the shortest combined path, or None if they did not meet.
+    """
+    next_frontier = []
+    meeting = None
+    best_length = None
+    goal_distances = [(distances, distances[goal]) for distances in landmark_distances]
+
+    for person in frontier:
+
+        # Nobody on a shortest path is ever further from the goal than the bounds allow
+        if upper is not None and depth[person] + lower_bound(person, goal_distances) > upper:
+            continue
+
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+
+            # Every star of a movie is reached the first time the movie is expanded
+            if movie in expanded_movies:
+                continue
+            expanded_movies.add(movie)
+
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                neighbor = movie_people[j]
+                if neighbor in depth:
+                    continue
+                parents[neighbor] = (movie, person)
+                depth[neighbor] = depth[person] + 1
+                next_frontier.append(neighbor)
+
+                # The whole level is finished before returning, because people reached
+                # later in this level may be closer to the other side's start
+                if neighbor in other_depth:
+                    length = depth[neighbor] + other_depth[neighbor]
+                    if best_length is None or length < best_length:
+                        best_length = length
+                        meeting = neighbor
+
+    return next_frontier, meeting
+
+
+def join_paths(meeting, forward_parents, backward_parents):
+    """
+    Joins the two halves of a bidirectional search that met at `meeting`
+    into a single list of (movie_id, person_id) pairs from source to target.
+    """
+    # Walk back from the meeting person to the source
+    path = tree_path(forward_parents, meeting)
+
+    # Walk forward from the meeting person to the target
+    person = meeting
+    while backward_parents[person] is not None:
+        movie, parent = backward_parents[person]
+        path.append((movie_ids[movie], person_ids[parent]))
+        person = parent
+
+    return path
+
+
+def shortest_paths(source, targets):
+    """
+    Returns a dictionary mapping each person_id in `targets` to the
+    shortest list of (movie_id, person_id) pairs that connect the source
+    to it, or to None if there is no possible path.
+
+    All targets share one breadth-first tree grown from the source,
+    which stops growing once every target has been reached.
+    """
+    source = person_index[source]
+    remaining = set(person_index[target] for target in targets)
+    remaining.discard(source)
+
+    # Maps each reached person index to the (movie, person) step that reached it
+    parents = {source: None}
+    expanded_movies = set()
+    frontier = [source]
+
+    while frontier and remaining:
+        next_frontier = []
+        for person in frontier:
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if movie in expanded_movies:
+                    continue
+                expanded_movies.add(movie)
+
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = (movie, person)
+                    next_frontier.append(neighbor)
+                    remaining.discard(neighbor)
+        frontier = next_frontier
+
+    paths = {}
+    for target in targets:
+        person = person_index[target]
+        paths[target] = tree_path(parents, person) if person in parents else None
+    return paths
+
+
+def distances_from(person):
+    """
+    Returns an array of breadth-first distances from the person at index
+    `person` to every person index, with -1 for people not connected to it.
+    """
+    distances = array("i", [-1]) * len(person_ids)
+    distances[person] = 0
+    expanded_movies = bytearray(len(movie_ids))
+    frontier = [person]
+    depth = 0
+
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if expanded_movies[movie]:
+                    continue
+                expanded_movies[movie] = 1
+
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if distances[neighbor] == -1:
+                        distances[neighbor] = depth
+                        next_frontier.append(neighbor)
+        frontier = next_frontier
+
+    return distances
+
+
+def build_landmarks(count=LANDMARKS):
+    """
+    Replace the landmark index with distances from the `count` people
+    whose movies have the most stars in total.
+    """
+    def reach(person):
+        return sum(
+            movie_offsets[person_movies[i] + 1] - movie_offsets[person_movies[i]]
+            for i in range(person_offsets[person], person_offsets[person + 1])
+        )
+
+    landmarks[:] = heapq.nlargest(count, range(len(person_ids)), key=reach)
+    landmark_distances[:] = []
+    for landmark in landmarks:
+        distances = distances_from(landmark)
+        if max(distances, default=0) >= UNREACHABLE:
+            raise ValueError("Degrees of separation too large for the landmark index")
+        landmark_distances.append(array("B", (
+            UNREACHABLE if distance == -1 else distance for distance in distances
+        )))
+
+
+def load_landmarks(directory, key):
+    """
+    Load the landmark index from `directory` if it exists and matches `key`.
+    Return True if the index was loaded.
+    """
+    landmarks[:] = []
+    landmark_distances[:] = []
+    try:
+        with open(os.path.join(directory, LANDMARK_FILE), "rb") as f:
+            index = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return False
+    if index.get("key") != key:
+        return False
+
+    landmarks.extend(person_index[person_id] for person_id in index["landmarks"])
+    landmark_distances.extend(index["distances"])
+    return True
+
+
+def save_landmarks(directory, years=None, min_cast=None):
+    """
+    Write the landmark index to `directory`, tagged with the key of
+    the CSV files and filters it was built from.
+    """
+    index = {
+        "key": snapshot_key(directory, years, min_cast),
+        "landmarks": [person_ids[landmark] for landmark in landmarks],
+        "distances": landmark_distances
+    }
+    path = os.path.join(directory, LANDMARK_FILE)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def distance_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two person_ids from the landmark index, or None if the index shows
+    they are not connected. `upper` is None when no landmark reaches them.
+    """
+    return landmark_bounds(person_index[source], person_index[target])
+
+
+def landmark_bounds(source, target):
+    """
+    Returns (lower, upper) distance bounds between two person indexes,
+    or None if they are not connected.
+    """
+    lower = 0
+    upper = None
+    for distances in landmark_distances:
+        source_distance = distances[source]
+        target_distance = distances[target]
+
+        # A landmark that reaches only one of them proves they are in different components
+        if source_distance == UNREACHABLE and target_distance == UNREACHABLE:
+            continue
+        if source_distance == UNREACHABLE or target_distance == UNREACHABLE:
+            return None
+
+        lower = max(lower, abs(source_distance - target_distance))
+        if upper is None or source_distance + target_distance < upper:
+            upper = source_distance + target_distance
+
+    return lower, upper
 
 
+def landmark_path(source, target):
+    """
+    Returns the list of (movie_id, person_id) pairs of a path from the
+    source index to the target index through the landmark that gives the
+    smallest upper bound on their distance.
+    """
+    distances = min(
+        (distances for distances in landmark_distances if distances[source] != UNREACHABLE),
+        key=lambda distances: distances[source] + distances[target]
+    )
+
+    # Walk from the source down to the landmark
+    path = []
+    person = source
+    while distances[person] > 0:
+        movie, person = step_towards_landmark(person, distances)
+        path.append((movie_ids[movie], person_ids[person]))
+
+    # Walk from the target down to the landmark, then reverse those steps
+    steps = []
+    person = target
+    while distances[person] > 0:
+        movie, closer = step_towards_landmark(person, distances)
+        steps.append((movie_ids[movie], person_ids[person]))
+        person = closer
+    steps.reverse()
+
+    return path + steps
+
+
+def step_towards_landmark(person, distances):
+    """
+    Returns a (movie, person) index pair for a co-star of the person at
+    index `person` who is one step closer to the landmark of `distances`.
+    """
+    for movie, neighbor in neighbor_indexes(person):
+        if distances[neighbor] == distances[person] - 1:
+            return movie, neighbor
+
+
+def lower_bound(person, goal_distances):
+    """
+    Returns the landmark lower bound on the distance from the person index
+    `person` to the goal whose landmark distances are in `goal_distances`.
+    """
+    bound = 0
+    for distances, goal_distance in goal_distances:
+        distance = distances[person]
+        if distance == UNREACHABLE:
+            continue
+        if distance > goal_distance:
+            distance -= goal_distance
+        else:
+            distance = goal_distance - distance
+        if distance > bound:
+            bound = distance
+    return bound
+
+
+def tree_path(parents, person):
+    """
+    Returns the list of (movie_id, person_id) pairs leading from the
+    root of the search tree described by `parents` to `person`.
+    """
+    path = []
+    while parents[person] is not None:
+        movie, parent = parents[person]
+        path.append((movie_ids[movie], person_ids[person]))
+        person = parent
+    path.reverse()
+    return path
+
 
 def person_id_for_name(name):
     """
@@ -176,18 +873,138 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def build_name_index():
+    """
+    Build the sorted name list, the people with each name and the
+    trigram index used by search_names.
+    """
+    named = {}
+    for person, name in enumerate(person_names):
+        named.setdefault(name.lower(), []).append(person)
+    name_keys.replace(sorted(named))
+    offsets = array("l", [0])
+    people_named = array("i")
+    for name in name_keys:
+        people_named.extend(named[name])
+        offsets.append(len(people_named))
+    name_offsets[:] = offsets
+    name_people[:] = people_named
+
+    name_trigrams.clear()
+    for position, name in enumerate(name_keys):
+        for trigram in trigrams_of(name):
+            positions = name_trigrams.get(trigram)
+            if positions is None:
+                positions = name_trigrams[trigram] = array("i")
+            positions.append(position)
+
+
+def trigrams_of(name):
+    """
+    Returns the set of three-character substrings of a padded name.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def search_names(query, limit=10):
+    """
+    Returns up to `limit` person_ids whose names best match `query`
+    without prompting: exact matches first, then names starting with
+    the query, then names sharing the most trigrams with it.
+    """
+    query = " ".join(query.lower().split())
+
+    # Exact and prefix matches are adjacent in the sorted name list, the exact
+    # one first, and are kept as positions in it
+    matches = []
+    position = bisect_left(name_keys, query)
+    while position < len(name_keys) and len(matches) < limit:
+        if not name_keys[position].startswith(query):
+            break
+        matches.append(position)
+        position += 1
+
+    # Fuzzy matches, only needed when nothing starts with the query: the names in the
+    # posting lists of the query's trigrams are counted from the rarest list up, until
+    # FUZZY_POSTINGS positions, and only the names found most are compared in full
+    if not matches:
+        query_trigrams = trigrams_of(query)
+        needed = (len(query_trigrams) + 1) // 2
+        positions = sorted((name_trigrams.get(trigram, ()) for trigram in query_trigrams), key=len)
+        counted = []
+        total = 0
+        for rare in positions:
+            total += len(rare)
+            if total > FUZZY_POSTINGS:
+                break
+            counted.append(rare)
+
+        scored = []
+        for position in fuzzy_candidates(counted):
+            name_trigrams_set = trigrams_of(name_keys[position])
+            shared = len(query_trigrams & name_trigrams_set)
+            if shared >= needed:
+                similarity = shared / (len(query_trigrams) + len(name_trigrams_set) - shared)
+                scored.append((similarity, position))
+        for similarity, position in heapq.nlargest(limit, scored):
+            matches.append(position)
+
+    found = []
+    for position in matches:
+        people_named = name_people[name_offsets[position]:name_offsets[position + 1]]
+        found.extend(sorted(person_ids[person] for person in people_named))
+    return found[:limit]
+
+
+def fuzzy_candidates(postings):
+    """
+    Returns the positions in name_keys of up to FUZZY_CANDIDATES names
+    found in the most of the `postings` lists, taking the first in name
+    order among those found as often as the last one kept.
+    """
+    if np is None:
+        candidates = Counter()
+        for positions in postings:
+            candidates.update(positions)
+        return heapq.nsmallest(
+            FUZZY_CANDIDATES, candidates, key=lambda position: (-candidates[position], position)
+        )
+
+    # Count every list in one pass; sorting the few positions found is cheaper
+    # than a bincount as long as the name list
+    postings = [np.frombuffer(positions, dtype=np.intc) for positions in postings if len(positions)]
+    if not postings:
+        return []
+    found, counts = np.unique(np.concatenate(postings), return_counts=True)
+    if len(found) > FUZZY_CANDIDATES:
+        cut = np.partition(counts, len(counts) - FUZZY_CANDIDATES)[len(counts) - FUZZY_CANDIDATES]
+        above = found[counts > cut]
+        found = np.concatenate([above, found[counts == cut][:FUZZY_CANDIDATES - len(above)]])
+    return found.tolist()
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie, person in neighbor_indexes(person_index[person_id]):
+        neighbors.add((movie_ids[movie], person_ids[person]))
     return neighbors
 
 
+def neighbor_indexes(person):
+    """
+    Yields (movie, person) index pairs for people
+    who starred with the person at index `person`.
+    """
+    for i in range(person_offsets[person], person_offsets[person + 1]):
+        movie = person_movies[i]
+        for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+            yield movie, movie_people[j]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+import time
+
+import degrees
+
+# Number of random queries timed with and without the landmark index
+QUERIES = 100
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [count]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else degrees.LANDMARKS
+
+    # Load data from files into memory
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    # Build and save the index
+    start = time.perf_counter()
+    degrees.build_landmarks(count)
+    build_time = time.perf_counter() - start
+    degrees.save_landmarks(directory)
+    size = os.path.getsize(os.path.join(directory, degrees.LANDMARK_FILE))
+    print(f"Built {len(degrees.landmarks)} landmarks in {build_time:.2f}s ({size} bytes on disk).")
+
+    # Time the same queries with and without the index
+    pairs = [
+        (random.choice(degrees.person_ids), random.choice(degrees.person_ids))
+        for i in range(QUERIES)
+    ]
+    with_index = time_queries(pairs)
+    saved = degrees.landmarks[:], degrees.landmark_distances[:]
+    degrees.landmarks[:] = []
+    degrees.landmark_distances[:] = []
+    without_index = time_queries(pairs)
+    degrees.landmarks[:], degrees.landmark_distances[:] = saved
+
+    print(f"Mean query time with landmarks: {with_index * 1000:.3f}ms")
+    print(f"Mean query time without landmarks: {without_index * 1000:.3f}ms")
+
+
+def time_queries(pairs):
+    """
+    Return the mean time taken by shortest_path over (source, target) pairs.
+    """
+    start = time.perf_counter()
+    for source, target in pairs:
+        degrees.shortest_path(source, target)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import stat
+import sys
+from collections import OrderedDict
+
+import degrees
+from batch import candidates, load_worker, result_record
+
+# Number of shortest_path results kept, least recently used first out
+CACHE_SIZE = 10000
+
+# Maps (source, target) person_id pairs to their path, most recently used last
+cache = OrderedDict()
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python server.py directory [socket]")
+    directory = sys.argv[1]
+    socket_path = sys.argv[2] if len(sys.argv) == 3 else None
+
+    # Load data from files into memory
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    # Workers are started before any client connects, so they never inherit client sockets
+    with multiprocessing.Pool(initializer=load_worker, initargs=(directory,)) as pool:
+        if socket_path is None:
+            asyncio.run(serve_stdin(pool))
+        else:
+            asyncio.run(serve_socket(pool, socket_path))
+
+
+async def serve_stdin(pool):
+    """
+    Answer JSON line requests from standard input on standard output.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    feeder = None
+
+    # Regular files cannot be watched by the event loop, so they are read in a thread instead
+    if stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+        feeder = asyncio.create_task(feed_file(reader, sys.stdin.buffer))
+    else:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    def write(response):
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+    await serve(reader, write, pool)
+    if feeder is not None:
+        await feeder
+
+
+async def feed_file(reader, f):
+    """
+    Feed the lines of the binary file object `f` to `reader`, reading
+    them in a thread so the event loop is never blocked on disk.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, f.readline)
+        if not line:
+            break
+        reader.feed_data(line)
+    reader.feed_eof()
+
+
+async def serve_socket(pool, socket_path):
+    """
+    Answer JSON line requests from every client of a Unix socket at `socket_path`.
+    """
+    async def handle(reader, writer):
+        def write(response):
+            writer.write((json.dumps(response) + "\n").encode("utf-8"))
+
+        await serve(reader, write, pool)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve(reader, write, pool):
+    """
+    Read requests line by line and answer each one as soon as it is done,
+    so slow searches do not hold up the requests behind them.
+    """
+    pending = set()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.create_task(answer(line, write, pool))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.wait(pending)
+
+
+async def answer(line, write, pool):
+    """
+    Answer one JSON request, echoing its "id" in the response.
+    """
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError:
+        write({"error": "Invalid JSON."})
+        return
+    if not isinstance(request, dict):
+        write({"error": "Request must be a JSON object."})
+        return
+
+    # Any failure is reported to the client, which would otherwise wait for an answer forever
+    try:
+        response = await handle_request(request, pool)
+    except KeyError as e:
+        response = {"error": f"Missing field {e}."}
+    except Exception as e:
+        response = {"error": f"{type(e).__name__}: {e}"}
+    if "id" in request:
+        response["id"] = request["id"]
+    write(response)
+
+
+async def handle_request(request, pool):
+    """
+    Return the response to a person_id_for_name or shortest_path request.
+    """
+    op = request.get("op")
+
+    if op == "person_id_for_name":
+        return {"candidates": candidates(request["name"])}
+
+    elif op == "shortest_path":
+        source = request["source"]
+        target = request["target"]
+        for person_id in [source, target]:
+            if person_id not in degrees.people:
+                return {"error": f"Unknown person_id {person_id!r}."}
+
+        key = (source, target)
+        if key in cache:
+            cache.move_to_end(key)
+            path = cache[key]
+        else:
+            path = await run_in_pool(pool, degrees.shortest_path, source, target)
+            cache[key] = path
+            if len(cache) > CACHE_SIZE:
+                cache.popitem(last=False)
+        return result_record(source, target, path)
+
+    return {"error": f"Unknown op {op!r}."}
+
+
+def run_in_pool(pool, func, *args):
+    """
+    Return an asyncio future for the result of func(*args) in a worker of `pool`.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result):
+        loop.call_soon_threadsafe(future.set_result, result)
+
+    def fail(error):
+        loop.call_soon_threadsafe(future.set_exception, error)
+
+    pool.apply_async(func, args, callback=resolve, error_callback=fail)
+    return future
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Mapping, Sequence
+from itertools import accumulate
+
+
+class Node():
+    def __init__(self, state, parent, action):
+        self.state = state
+        self.parent = parent
+        self.action = action
+
+
+class StackFrontier():
+    def __init__(self, goal=None):
+        self.frontier = deque()
+
+        # Counts how many nodes in the frontier hold each state, so membership is O(1)
+        self.states = {}
+
+        # Goal test happens when a node is generated: the first node added
+        # whose state is `goal` is kept here
+        self.goal = goal
+        self.solution = None
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+        if self.solution is None and self.goal is not None and node.state == self.goal:
+            self.solution = node
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.discard_state(node.state)
+            return node
+
+    def discard_state(self, state):
+        if self.states[state] == 1:
+            del self.states[state]
+        else:
+            self.states[state] -= 1
+
+
+class QueueFrontier(StackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.discard_state(node.state)
+            return node
+
+
+class Strings(Sequence):
+    """
+    A sequence of strings packed into one string and an array of where each
+    ends, so it is pickled and loaded in one piece instead of string by string.
+    """
+
+    def __init__(self, values=()):
+        self.replace(values)
+
+    def replace(self, values):
+        """
+        Replace the contents with those of another Strings or any iterable of strings.
+        """
+        if isinstance(values, Strings):
+            self.text, self.offsets = values.text, values.offsets
+            return
+        values = list(values)
+        self.text = "".join(values)
+        self.offsets = array("l", [0])
+        self.offsets.extend(accumulate(len(value) for value in values))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Strings index out of range")
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        text, offsets = self.text, self.offsets
+        for i in range(len(offsets) - 1):
+            yield text[offsets[i]:offsets[i + 1]]
+
+
+class Index(Mapping):
+    """
+    Maps each string of `keys` to its position, by binary search over `order`,
+    the positions of `keys` sorted by string, in place of a dictionary.
+    """
+
+    def __init__(self, keys, order):
+        self.keys = keys
+        self.order = order
+
+    def __getitem__(self, key):
+        i = bisect_left(self.order, key, key=self.keys.__getitem__)
+        if i < len(self.order) and self.keys[self.order[i]] == key:
+            return self.order[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class Groups(Mapping):
+    """
+    Maps each string of the sorted sequence `keys` to the set of ids[j] for the
+    indexes j in its row of a CSR layout: rows[offsets[k]:offsets[k + 1]] for keys[k].
+    """
+
+    def __init__(self, keys, offsets, rows, ids):
+        self.keys = keys
+        self.offsets = offsets
+        self.rows = rows
+        self.ids = ids
+
+    def __getitem__(self, key):
+        k = bisect_left(self.keys, key)
+        if k == len(self.keys) or self.keys[k] != key:
+            raise KeyError(key)
+        return {self.ids[j] for j in self.rows[self.offsets[k]:self.offsets[k + 1]]}
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class Records(Mapping):
+    """
+    Maps the keys of `index` to a dictionary of their fields, where each
+    field is a sequence indexed like the keys, built on every lookup.
+    """
+
+    def __init__(self, index, **fields):
+        self.index = index
+        self.fields = fields
+
+    def __getitem__(self, key):
+        i = self.index[key]
+        return {field: values[i] for field, values in self.fields.items()}
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+
+from heredity import PROBS, load_data
+from inference import infer
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python batch.py directory|families.jsonl|- [output.jsonl] [cache.jsonl]")
+    families = load_families(sys.argv[1])
+    cache_file = sys.argv[3] if len(sys.argv) == 4 else None
+    cache = load_cache(cache_file)
+
+    records = solve_families(families, cache)
+    if cache_file is not None:
+        save_cache(cache_file, cache)
+
+    if len(sys.argv) >= 3:
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            write_records(records, f)
+    else:
+        write_records(records, sys.stdout)
+
+
+def load_families(source):
+    """
+    Return a list of (id, people, error) triples, with people in the form
+    returned by heredity.load_data, from a directory of CSV files (with the
+    file name as id), or from a JSONL file, or standard input if `source`
+    is "-", with one {"id": ..., "people": [{"name", "mother", "father", "trait"}]}
+    object per line. A family that cannot be read has people None and an
+    error message, so it does not stop the others.
+    """
+    if os.path.isdir(source):
+        families = []
+        for filename in sorted(os.listdir(source)):
+            if not filename.endswith(".csv"):
+                continue
+            try:
+                families.append((filename, load_data(os.path.join(source, filename)), None))
+            except (KeyError, ValueError, UnicodeDecodeError) as e:
+                families.append((filename, None, f"Invalid family file: {e!r}."))
+        return families
+
+    f = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        families = []
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            family_id = number
+            try:
+                family = json.loads(line)
+                if not isinstance(family, dict):
+                    raise ValueError("a family must be a JSON object")
+                family_id = family.get("id", number)
+                families.append((family_id, people_from_rows(family["people"]), None))
+            except json.JSONDecodeError:
+                families.append((family_id, None, "Invalid JSON."))
+            except KeyError as e:
+                families.append((family_id, None, f"Missing field {e}."))
+            except (TypeError, ValueError) as e:
+                families.append((family_id, None, f"Invalid family: {e}."))
+        return families
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def people_from_rows(rows):
+    """
+    Return people in the form returned by heredity.load_data from a list of
+    dictionaries with keys name, mother, father and trait, where a trait
+    may be true, false, 1, 0 or missing. Raise ValueError for anything else.
+    """
+    if not isinstance(rows, list):
+        raise ValueError("people must be a list")
+    people = dict()
+    for row in rows:
+        if not isinstance(row, dict) or not isinstance(row.get("name"), str) or not row["name"]:
+            raise ValueError("every person needs a name")
+        trait = row.get("trait")
+        if trait not in [None, "", True, False, 0, 1, "0", "1"]:
+            raise ValueError(f"trait of {row['name']!r} must be true, false, 1, 0 or missing")
+        for parent in ["mother", "father"]:
+            if not isinstance(row.get(parent) or "", str):
+                raise ValueError(f"{parent} of {row['name']!r} must be a name")
+        people[row["name"]] = {
+            "name": row["name"],
+            "mother": row.get("mother") or None,
+            "father": row.get("father") or None,
+            "trait": None if trait in [None, ""] else bool(int(trait))
+        }
+    return people
+
+
+def family_key(people, probs=PROBS):
+    """
+    Return a hash identifying a family and the probability table it is
+    solved with, the same whatever order people were listed in.
+    """
+    canonical = json.dumps({
+        "people": sorted(
+            [person["name"], person["mother"], person["father"], person["trait"]]
+            for person in people.values()
+        ),
+        "probs": probs
+    }, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def check_family(people):
+    """
+    Return an error message if a family cannot be solved, or None.
+    """
+    for person in people.values():
+        for parent in (person["mother"], person["father"]):
+            if parent is not None and parent not in people:
+                return f"Unknown parent {parent!r} of {person['name']!r}."
+    return None
+
+
+def solve_families(families, cache):
+    """
+    Return one result record per (id, people, error) family, in input order.
+
+    Families are solved in a pool of worker processes, once for each
+    distinct family, and only if their key is not already in `cache`,
+    which is updated with the new results. Families that could not be
+    read or solved get a record with their error instead.
+    """
+    keys = [None if people is None else family_key(people) for family_id, people, error in families]
+    errors = [
+        error if people is None else check_family(people)
+        for family_id, people, error in families
+    ]
+    tasks = dict()
+    for key, error, (family_id, people, _) in zip(keys, errors, families):
+        if error is None and key not in cache:
+            tasks.setdefault(key, people)
+
+    if tasks:
+        with multiprocessing.Pool() as pool:
+            for key, probabilities in pool.imap_unordered(solve, tasks.items()):
+                cache[key] = probabilities
+
+    records = []
+    for key, error, (family_id, people, _) in zip(keys, errors, families):
+        record = {"id": family_id}
+        if key is not None:
+            record["key"] = key
+        if error is None:
+            record["marginals"] = {person: cache[key][person] for person in people}
+        else:
+            record["error"] = error
+        records.append(record)
+    return records
+
+
+def solve(task):
+    """
+    Return the key of a family and the gene and trait probabilities of its people.
+    """
+    key, people = task
+    probabilities = infer(people, PROBS)
+
+    # Marginals are kept with string keys, as they are written to and read from JSON
+    return key, {
+        person: {
+            "gene": {str(genes): p for genes, p in probabilities[person]["gene"].items()},
+            "trait": {str(trait).lower(): p for trait, p in probabilities[person]["trait"].items()}
+        }
+        for person in probabilities
+    }
+
+
+def load_cache(filename):
+    """
+    Return a dictionary of cached marginals by family key from a JSONL
+    cache file, or an empty one if there is no file.
+    """
+    cache = dict()
+    if filename is None or not os.path.exists(filename):
+        return cache
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            cache[entry["key"]] = entry["marginals"]
+    return cache
+
+
+def save_cache(filename, cache):
+    """
+    Write every cached result to a JSONL cache file.
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        for key, marginals in cache.items():
+            f.write(json.dumps({"key": key, "marginals": marginals}) + "\n")
+
+
+def write_records(records, f):
+    """
+    Write records to the file object `f` as JSON lines.
+    """
+    for record in records:
+        f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
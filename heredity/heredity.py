@@ -2,6 +2,10 @@ import csv
 import itertools
 import sys
 
+from inference import infer
+from sampling import SAMPLES, sample_probabilities
+from vectorized import enumerate_vectorized
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -40,10 +44,45 @@ PROBS = {
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3, 4, 5]:
+        sys.exit("Usage: python heredity.py data.csv [eliminate|enumerate|vectorize|gibbs|weight] [samples] [seed]")
     people = load_data(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) >= 3 else "eliminate"
+    samples = int(sys.argv[3]) if len(sys.argv) >= 4 else SAMPLES
+    seed = int(sys.argv[4]) if len(sys.argv) == 5 else None
+
+    # Exact inference on the family tree, or enumeration of every assignment
+    if method == "eliminate":
+        probabilities = infer(people, PROBS)
+    elif method == "enumerate":
+        probabilities = enumerate_probabilities(people)
+    elif method == "vectorize":
+        probabilities = enumerate_vectorized(people, PROBS)
+
+    # Approximate inference for families too large for exact inference
+    elif method in ["gibbs", "weight"]:
+        probabilities, diagnostic = sample_probabilities(people, PROBS, method, samples, seed)
+        for name, value in diagnostic.items():
+            print(f"{name}: {value:.4f}", file=sys.stderr)
+    else:
+        sys.exit(f"Unknown method {method!r}")
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
 
+
+def enumerate_probabilities(people):
+    """
+    Return the gene and trait probabilities of every person in `people`
+    by summing the joint probability of every assignment of genes and
+    traits consistent with the known traits.
+    """
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -60,38 +99,14 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    # Update probabilities with the joint probability of every assignment
+    for one_gene, two_genes, have_trait in assignments(people):
+        p = joint_probability(people, one_gene, two_genes, have_trait)
+        update(probabilities, one_gene, two_genes, have_trait, p)
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
-
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -116,16 +131,39 @@ def load_data(filename):
     return data
 
 
+def assignments(people):
+    """
+    Yield every (one_gene, two_genes, have_trait) assignment of genes and
+    traits that agrees with the known traits, one at a time.
+
+    People with a known trait are placed in or out of `have_trait` up front,
+    so only the people whose trait is unknown are enumerated, and no trait
+    set that contradicts the evidence is built or checked.
+    """
+    names = set(people)
+    known_trait = set(person for person in names if people[person]["trait"])
+    unknown = set(person for person in names if people[person]["trait"] is None)
+
+    # Loop over all sets of people with an unknown trait who might have it
+    for unknown_trait in powerset(unknown):
+        have_trait = known_trait | unknown_trait
+
+        # Loop over all sets of people who might have the gene
+        for one_gene in powerset(names):
+            for two_genes in powerset(names - one_gene):
+                yield one_gene, two_genes, have_trait
+
+
 def powerset(s):
     """
-    Return a list of all possible subsets of set s.
+    Return an iterator over all possible subsets of set s,
+    generating each subset only when it is needed.
     """
     s = list(s)
-    return [
-        set(s) for s in itertools.chain.from_iterable(
-            itertools.combinations(s, r) for r in range(len(s) + 1)
-        )
-    ]
+    for subset in itertools.chain.from_iterable(
+        itertools.combinations(s, r) for r in range(len(s) + 1)
+    ):
+        yield set(subset)
 
 
 def joint_probability(people, one_gene, two_genes, have_trait):
@@ -217,7 +255,7 @@ def update(probabilities, one_gene, two_genes, have_trait, p):
     # and if the person is in have_trait
     for person in probabilities:
         number_of_mut_genes = (2 if person in two_genes
-                              ``else 1 if person in one_gene
+                              else 1 if person in one_gene
                               else 0)
 
         # Update person's probability distributions
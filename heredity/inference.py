@@ -0,0 +1,220 @@
+import heapq
+import itertools
+
+# Number of copies of the gene a person can have
+GENES = (0, 1, 2)
+
+
+def infer(people, probs):
+    """
+    Return the gene and trait probabilities of every person in `people`,
+    given the probability table `probs` laid out like heredity.PROBS,
+    in the same form as the `probabilities` dictionary built by
+    heredity.main, conditioned on every known trait.
+
+    Rather than enumerating every assignment of genes and traits, the
+    family is turned into a junction tree: one factor per person over
+    their genes and their parents' genes, joined into cliques by variable
+    elimination. Messages are passed up the tree and back down again, so
+    every person's marginal comes from the same two passes, in time linear
+    in the size of the family when the family tree has no loops.
+    """
+    factors = [person_factor(people, person, probs) for person in people]
+    order = elimination_order(people)
+    cliques, parent = junction_tree(factors, order)
+
+    # Collect messages from the leaves up to the roots, each scaled to sum
+    # to 1 so that the product of many small probabilities does not underflow
+    upward = dict()
+    for i in range(len(order)):
+        incoming = [upward[child] for child in cliques[i]["children"]]
+        if parent[i] is not None:
+            upward[i] = normalize(sum_out(multiply(cliques[i]["factors"] + incoming), [order[i]]))
+
+    # Distribute messages from the roots back down to the leaves
+    downward = dict()
+    for i in reversed(range(len(order))):
+        if parent[i] is not None:
+            j = parent[i]
+            incoming = [upward[child] for child in cliques[j]["children"] if child != i]
+            if j in downward:
+                incoming.append(downward[j])
+            product = multiply(cliques[j]["factors"] + incoming)
+            downward[i] = normalize(sum_out(product, [v for v in product[0] if v not in upward[i][0]]))
+
+    # Each person is eliminated in exactly one clique, whose belief gives their marginal
+    probabilities = dict()
+    for i, person in enumerate(order):
+        incoming = [upward[child] for child in cliques[i]["children"]]
+        if i in downward:
+            incoming.append(downward[i])
+        belief = multiply(cliques[i]["factors"] + incoming)
+        belief = sum_out(belief, [v for v in belief[0] if v != person])
+        total = sum(belief[1].values())
+        gene = {genes: belief[1][(genes,)] / total for genes in reversed(GENES)}
+
+        # A known trait is certain, an unknown one follows from the person's genes
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = sum(gene[genes] * probs["trait"][genes][True] for genes in GENES)
+            trait = {True: has_trait, False: 1 - has_trait}
+        else:
+            trait = {True: float(trait), False: float(not trait)}
+        probabilities[person] = {"gene": gene, "trait": trait}
+
+    return {person: probabilities[person] for person in people}
+
+
+def person_factor(people, person, probs):
+    """
+    Return the factor of one person: the probability of their number of
+    genes given their parents' numbers of genes, times the probability of
+    their trait if it is known, over the person and their parents.
+
+    A factor is a pair (variables, table), where the table maps a tuple of
+    numbers of genes, one per variable, to a probability.
+    """
+    parents = tuple(
+        parent for parent in (people[person]["mother"], people[person]["father"])
+        if parent
+    )
+    trait = people[person]["trait"]
+
+    table = dict()
+    for genes in itertools.product(GENES, repeat=len(parents) + 1):
+        p = inheritance(genes[0], genes[1:], probs) if parents else probs["gene"][genes[0]]
+        if trait is not None:
+            p *= probs["trait"][genes[0]][trait]
+        table[genes] = p
+    return (person,) + parents, table
+
+
+def inheritance(genes, parent_genes, probs):
+    """
+    Return the probability of a child having `genes` copies of the gene
+    given the numbers of genes of their parents. A missing parent passes
+    the gene on only by mutation, as in heredity.joint_probability.
+    """
+    passed = [
+        1 - probs["mutation"] if parent == 2
+        else 0.5 if parent == 1
+        else probs["mutation"]
+        for parent in parent_genes
+    ]
+    mother, father = (passed + [probs["mutation"]])[:2]
+    if genes == 2:
+        return mother * father
+    elif genes == 1:
+        return (1 - mother) * father + (1 - father) * mother
+    return (1 - mother) * (1 - father)
+
+
+def elimination_order(people):
+    """
+    Return the people in the order their genes are summed out: at every
+    step, the person with the fewest neighbours in the moral graph, where
+    each person is joined to their parents and parents to each other.
+    """
+    neighbors = {person: set() for person in people}
+    for person in people:
+        family = [person] + [
+            parent for parent in (people[person]["mother"], people[person]["father"])
+            if parent
+        ]
+        for a, b in itertools.combinations(family, 2):
+            neighbors[a].add(b)
+            neighbors[b].add(a)
+
+    # Degrees change as people are eliminated, so stale heap entries are skipped
+    heap = [(len(neighbors[person]), person) for person in people]
+    heapq.heapify(heap)
+    order = []
+    eliminated = set()
+    while heap:
+        degree, person = heapq.heappop(heap)
+        if person in eliminated or degree != len(neighbors[person]):
+            continue
+        order.append(person)
+        eliminated.add(person)
+
+        # Summing out a person joins all of their remaining neighbours
+        for a in neighbors[person]:
+            neighbors[a].discard(person)
+            neighbors[a].update(b for b in neighbors[person] if b != a)
+            heapq.heappush(heap, (len(neighbors[a]), a))
+        del neighbors[person]
+
+    return order
+
+
+def junction_tree(factors, order):
+    """
+    Return the cliques formed by eliminating variables in `order`, and
+    the index of the parent of each clique, or None for a root.
+
+    Clique i holds the factors first used when eliminating order[i], and
+    lists as children the cliques whose messages it receives.
+    """
+    position = {variable: i for i, variable in enumerate(order)}
+    cliques = [{"variables": {variable}, "factors": [], "children": []} for variable in order]
+
+    # Each factor goes to the clique of the first of its variables to be eliminated
+    for factor in factors:
+        first = min(position[variable] for variable in factor[0])
+        cliques[first]["factors"].append(factor)
+        cliques[first]["variables"].update(factor[0])
+
+    # A clique's message goes to the clique of the first of its other variables to be eliminated
+    parent = [None] * len(order)
+    for i, variable in enumerate(order):
+        separator = cliques[i]["variables"] - {variable}
+        if separator:
+            j = min(position[other] for other in separator)
+            parent[i] = j
+            cliques[j]["variables"].update(separator)
+            cliques[j]["children"].append(i)
+
+    return cliques, parent
+
+
+def multiply(factors):
+    """
+    Return the product of factors, over all of their variables.
+    """
+    variables = []
+    for factor in factors:
+        for variable in factor[0]:
+            if variable not in variables:
+                variables.append(variable)
+    positions = [[variables.index(variable) for variable in factor[0]] for factor in factors]
+
+    table = dict()
+    for genes in itertools.product(GENES, repeat=len(variables)):
+        p = 1
+        for factor, indexes in zip(factors, positions):
+            p *= factor[1][tuple(genes[i] for i in indexes)]
+        table[genes] = p
+    return tuple(variables), table
+
+
+def sum_out(factor, variables):
+    """
+    Return the factor with `variables` summed out.
+    """
+    scope, table = factor
+    keep = [i for i, variable in enumerate(scope) if variable not in variables]
+
+    result = dict()
+    for genes, p in table.items():
+        key = tuple(genes[i] for i in keep)
+        result[key] = result.get(key, 0) + p
+    return tuple(scope[i] for i in keep), result
+
+
+def normalize(factor):
+    """
+    Return the factor scaled so that its values sum to 1.
+    """
+    variables, table = factor
+    total = sum(table.values())
+    return variables, {genes: p / total for genes, p in table.items()}
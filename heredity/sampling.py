@@ -0,0 +1,250 @@
+import multiprocessing
+import random
+
+import numpy as np
+
+from inference import GENES, inheritance
+
+# Number of chains run in parallel, one per process, and the total number
+# of samples taken across them when no budget is given
+CHAINS = 4
+SAMPLES = 40000
+
+# Sweeps each Gibbs chain takes before its samples count, at most half of its sweeps
+BURN_IN = 500
+
+
+def sample_probabilities(people, probs, method="gibbs", samples=SAMPLES, seed=None, chains=CHAINS):
+    """
+    Return approximate gene and trait probabilities of every person in
+    `people`, in the same form as heredity.enumerate_probabilities, and
+    a convergence diagnostic, from `samples` samples split over `chains`
+    chains running in parallel processes.
+
+    With method "gibbs", each chain resamples one person's genes at a time
+    given everyone else's, and the diagnostic is the largest Gelman-Rubin
+    R-hat of anyone's number of genes: values close to 1 mean the chains
+    agree. With method "weight", each chain samples everyone's genes from
+    their parents' and weights the sample by the likelihood of the known
+    traits, and the diagnostic is the effective number of samples.
+    """
+    if method not in ["gibbs", "weight"]:
+        raise ValueError(f"Unknown sampling method {method!r}")
+    if samples < chains:
+        raise ValueError("Need at least one sample per chain")
+
+    seeds = np.random.SeedSequence(seed).spawn(chains)
+    tasks = [(people, probs, samples // chains, seed) for seed in seeds]
+    with multiprocessing.Pool(chains) as pool:
+        results = pool.map(gibbs_chain if method == "gibbs" else weighted_chain, tasks)
+
+    if method == "gibbs":
+        gene_counts = sum(np.array(result["genes"]) for result in results)
+        trait_counts = sum(np.array(result["trait"]) for result in results)
+        diagnostic = {"rhat": gelman_rubin(results)}
+    else:
+        # Chains scale their weights by their own largest weight, so rescale to the largest overall
+        top = max(result["log_scale"] for result in results)
+        scales = [np.exp(result["log_scale"] - top) for result in results]
+        gene_counts = sum(scale * result["genes"] for scale, result in zip(scales, results))
+        trait_counts = sum(scale * result["trait"] for scale, result in zip(scales, results))
+        total = sum(scale * result["weight"] for scale, result in zip(scales, results))
+        squares = sum(scale ** 2 * result["square_weight"] for scale, result in zip(scales, results))
+        diagnostic = {"effective_samples": total ** 2 / squares}
+
+    probabilities = dict()
+    for i, person in enumerate(people):
+        genes = gene_counts[i] / gene_counts[i].sum()
+        has_trait = trait_counts[i] / gene_counts[i].sum()
+        probabilities[person] = {
+            "gene": {count: genes[count].item() for count in reversed(GENES)},
+            "trait": {True: has_trait.item(), False: 1 - has_trait.item()}
+        }
+    return probabilities, diagnostic
+
+
+def family_tables(people, probs):
+    """
+    Return the family as lists indexed by person, in an order where parents
+    come before their children: the index of each person's mother and
+    father (None if unknown), their children, their known traits, and the
+    tables of gene and trait probabilities.
+    """
+    # Parents are placed before their children by a depth-first search
+    names = []
+    placed = set()
+
+    def place(name):
+        if name in placed:
+            return
+        placed.add(name)
+        for parent in (people[name]["mother"], people[name]["father"]):
+            if parent:
+                place(parent)
+        names.append(name)
+
+    for name in people:
+        place(name)
+
+    index = {name: i for i, name in enumerate(names)}
+    mother = [index.get(people[name]["mother"]) for name in names]
+    father = [index.get(people[name]["father"]) for name in names]
+    children = [[] for name in names]
+    for i in range(len(names)):
+        for parent in (mother[i], father[i]):
+            if parent is not None:
+                children[parent].append(i)
+
+    return {
+        "names": names,
+        "mother": mother,
+        "father": father,
+        "children": children,
+        "trait": [people[name]["trait"] for name in names],
+
+        # inherit[genes][mother's genes][father's genes], with a missing parent as 0 genes
+        "inherit": [
+            [[inheritance(genes, (m, f), probs) for f in GENES] for m in GENES]
+            for genes in GENES
+        ],
+        "prior": [probs["gene"][genes] for genes in GENES],
+        "has_trait": [probs["trait"][genes][True] for genes in GENES]
+    }
+
+
+def gene_probability(family, i, genes, assignment):
+    """
+    Return the probability of person i having `genes` copies of the gene
+    given their parents' genes in `assignment`.
+    """
+    m, f = family["mother"][i], family["father"][i]
+    if m is None and f is None:
+        return family["prior"][genes]
+    return family["inherit"][genes][0 if m is None else assignment[m]][0 if f is None else assignment[f]]
+
+
+def gibbs_chain(task):
+    """
+    Run one Gibbs sampling chain and return, in the order of `people`,
+    how many samples gave each person each number of genes, the summed
+    probability of each person having the trait, and the mean and
+    variance of each person's number of genes over the chain's samples.
+    """
+    people, probs, sweeps, seed = task
+    family = family_tables(people, probs)
+    n = len(family["names"])
+    rng = random.Random(int(seed.generate_state(1)[0]))
+    burn_in = min(BURN_IN, sweeps // 2)
+
+    # Start from a sample of everyone's genes given only their parents'
+    assignment = [0] * n
+    for i in range(n):
+        weights = [gene_probability(family, i, genes, assignment) for genes in GENES]
+        assignment[i] = rng.choices(GENES, weights)[0]
+
+    counts = [[0, 0, 0] for i in range(n)]
+    trait = [0.0] * n
+    series = []
+    for sweep in range(burn_in + sweeps):
+        for i in range(n):
+
+            # Person i's genes depend on their parents, their trait and their children
+            weights = []
+            for genes in GENES:
+                assignment[i] = genes
+                weight = gene_probability(family, i, genes, assignment)
+                if family["trait"][i] is not None:
+                    weight *= probs["trait"][genes][family["trait"][i]]
+                for child in family["children"][i]:
+                    weight *= gene_probability(family, child, assignment[child], assignment)
+                weights.append(weight)
+            assignment[i] = rng.choices(GENES, weights)[0]
+
+        if sweep >= burn_in:
+            series.append(assignment[:])
+            for i, genes in enumerate(assignment):
+                counts[i][genes] += 1
+                trait[i] += family["has_trait"][genes] if family["trait"][i] is None else family["trait"][i]
+
+    series = np.array(series)
+    index = {name: i for i, name in enumerate(family["names"])}
+    order = [index[person] for person in people]
+    return {
+        "genes": [counts[i] for i in order],
+        "trait": [trait[i] for i in order],
+        "mean": series.mean(axis=0)[order],
+        "variance": series.var(axis=0, ddof=1)[order] if len(series) > 1 else np.zeros(n),
+        "length": len(series)
+    }
+
+
+def weighted_chain(task):
+    """
+    Draw likelihood-weighted samples and return, in the order of `people`,
+    the weighted counts of each person's number of genes and the weighted
+    probability of each person having the trait, along with the sum of
+    the weights and of their squares, all scaled by exp(-log_scale).
+    """
+    people, probs, samples, seed = task
+    family = family_tables(people, probs)
+    n = len(family["names"])
+    rng = np.random.default_rng(seed)
+    inherit = np.array(family["inherit"])
+    prior = np.array(family["prior"])
+    has_trait = np.array(family["has_trait"])
+    trait_table = np.array([[probs["trait"][genes][False], probs["trait"][genes][True]] for genes in GENES])
+
+    # Sample everyone's genes from their parents', in parents-first order,
+    # weighting each sample by the likelihood of the known traits
+    genes = np.zeros((samples, n), dtype=np.int64)
+    log_weight = np.zeros(samples)
+    for i in range(n):
+        m, f = family["mother"][i], family["father"][i]
+        if m is None and f is None:
+            p = np.broadcast_to(prior, (samples, 3))
+        else:
+            mother_genes = genes[:, m] if m is not None else 0
+            father_genes = genes[:, f] if f is not None else 0
+            p = inherit[:, mother_genes, father_genes].T
+        genes[:, i] = (rng.random(samples)[:, np.newaxis] > p.cumsum(axis=1)).sum(axis=1).clip(max=2)
+        if family["trait"][i] is not None:
+            log_weight += np.log(trait_table[genes[:, i], int(family["trait"][i])])
+
+    log_scale = log_weight.max()
+    weight = np.exp(log_weight - log_scale)
+    index = {name: i for i, name in enumerate(family["names"])}
+    order = [index[person] for person in people]
+    genes = genes[:, order]
+    known = [people[person]["trait"] for person in people]
+    trait = np.array([
+        weight @ has_trait[genes[:, i]] if known[i] is None else weight.sum() * known[i]
+        for i in range(n)
+    ])
+    return {
+        "genes": np.array([np.bincount(genes[:, i], weights=weight, minlength=3) for i in range(n)]),
+        "trait": trait,
+        "weight": weight.sum(),
+        "square_weight": (weight ** 2).sum(),
+        "log_scale": log_scale
+    }
+
+
+def gelman_rubin(results):
+    """
+    Return the largest potential scale reduction factor (R-hat) over
+    everyone's number of genes, from the means and variances of each chain.
+    People whose genes never changed in any chain are left out.
+    """
+    means = np.array([result["mean"] for result in results])
+    variances = np.array([result["variance"] for result in results])
+    length = results[0]["length"]
+    if len(results) < 2 or length < 2:
+        return float("nan")
+
+    within = variances.mean(axis=0)
+    between = length * means.var(axis=0, ddof=1)
+    varying = within > 0
+    if not varying.any():
+        return 1.0
+    pooled = (length - 1) / length * within[varying] + between[varying] / length
+    return np.sqrt(pooled / within[varying]).max().item()
@@ -0,0 +1,81 @@
+import numpy as np
+
+from inference import GENES
+
+# Number of assignments evaluated together
+BATCH = 1 << 16
+
+
+def enumerate_vectorized(people, probs, batch=BATCH):
+    """
+    Return the gene and trait probabilities of every person in `people`,
+    like heredity.enumerate_probabilities, evaluating `batch` assignments
+    at a time with NumPy instead of one joint probability at a time.
+
+    Every assignment is numbered: the low base-3 digits of its number are
+    everyone's genes, and the bits above them the traits of the people
+    whose trait is unknown. A batch of numbers is decoded into integer
+    arrays, its joint probabilities are products of lookups into
+    precomputed tables, and they are scatter-added into the marginals.
+    """
+    names = list(people)
+    n = len(names)
+    index = {name: i for i, name in enumerate(names)}
+
+    # A missing parent passes the gene on only by mutation, like a parent with no gene
+    mother = np.array([index.get(people[name]["mother"], n) for name in names])
+    father = np.array([index.get(people[name]["father"], n) for name in names])
+    founder = np.array([not people[name]["mother"] and not people[name]["father"] for name in names])
+
+    # gene_table[genes, mother's genes, father's genes] and trait_table[genes, trait],
+    # from the probability of a parent with 0, 1 or 2 genes passing one on
+    passed = np.array([probs["mutation"], 0.5, 1 - probs["mutation"]])
+    from_mother, from_father = passed[:, np.newaxis], passed[np.newaxis, :]
+    gene_table = np.array([
+        (1 - from_mother) * (1 - from_father),
+        (1 - from_mother) * from_father + (1 - from_father) * from_mother,
+        from_mother * from_father
+    ])
+    prior = np.array([probs["gene"][genes] for genes in GENES])
+    trait_table = np.array([[probs["trait"][genes][False], probs["trait"][genes][True]] for genes in GENES])
+
+    # Known traits are fixed, only unknown ones are enumerated
+    known = np.array([people[name]["trait"] is not None for name in names])
+    fixed_trait = np.array([bool(people[name]["trait"]) for name in names], dtype=np.int64)
+    unknown = np.flatnonzero(~known)
+
+    total = 3 ** n * 2 ** len(unknown)
+    gene_marginals = np.zeros(3 * n)
+    trait_marginals = np.zeros(2 * n)
+    offsets = np.arange(n)
+    for start in range(0, total, batch):
+        numbers = np.arange(start, min(start + batch, total), dtype=np.int64)
+
+        # Decode each assignment into one row of genes and one of traits
+        genes = (numbers[:, np.newaxis] // 3 ** offsets) % 3
+        traits = np.empty_like(genes)
+        traits[:] = fixed_trait
+        traits[:, unknown] = (numbers[:, np.newaxis] // 3 ** n >> np.arange(len(unknown))) & 1
+
+        # Parents' genes, with a column of zeros standing in for missing parents
+        padded = np.zeros((len(numbers), n + 1), dtype=np.int64)
+        padded[:, :n] = genes
+        p = np.where(founder, prior[genes], gene_table[genes, padded[:, mother], padded[:, father]])
+        p = (p * trait_table[genes, traits]).prod(axis=1)
+
+        # Scatter-add each joint probability into every person's marginals
+        weights = np.repeat(p, n)
+        gene_marginals += np.bincount((3 * offsets + genes).ravel(), weights=weights, minlength=3 * n)
+        trait_marginals += np.bincount((2 * offsets + traits).ravel(), weights=weights, minlength=2 * n)
+
+    gene_marginals = gene_marginals.reshape(n, 3)
+    trait_marginals = trait_marginals.reshape(n, 2)
+    gene_marginals = (gene_marginals / gene_marginals.sum(axis=1, keepdims=True)).tolist()
+    trait_marginals = (trait_marginals / trait_marginals.sum(axis=1, keepdims=True)).tolist()
+    return {
+        name: {
+            "gene": {genes: gene_marginals[i][genes] for genes in reversed(GENES)},
+            "trait": {True: trait_marginals[i][1], False: trait_marginals[i][0]}
+        }
+        for i, name in enumerate(names)
+    }
@@ -0,0 +1,194 @@
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from generate import power_law_links
+from pagerank import DAMPING, TOLERANCE, LinkGraph, crawl, link_graph, power_iteration, sample_counts
+
+# Corpora shipped with the project, and sizes of the synthetic corpora compared after them
+CORPORA = ["corpus0", "corpus1", "corpus2"]
+SIZES = [1000, 10000, 100000]
+
+# Samples taken by the sampling estimator, and tolerance of the reference solution
+SAMPLE_SIZE = 1000000
+REFERENCE_TOLERANCE = 1e-12
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [iterations.csv]")
+
+    # Compare every solver on every corpus
+    directory = os.path.dirname(os.path.abspath(__file__))
+    graphs = [(name, link_graph(crawl(os.path.join(directory, name)))) for name in CORPORA]
+    graphs += [(f"scale-free-{size}", scale_free_graph(size)) for size in SIZES]
+    results = []
+    for name, graph in graphs:
+        reference = power_iteration(graph, DAMPING, REFERENCE_TOLERANCE)[0]
+        for solver in SOLVERS:
+            results.append(measure(name, graph, solver, reference))
+
+    print(f"{'corpus':<18}{'pages':>8}{'links':>10}  {'solver':<14}{'iterations':>10}"
+          f"{'seconds':>10}{'peak MB':>10}{'error':>12}")
+    for result in results:
+        print(f"{result['corpus']:<18}{result['pages']:>8}{result['links']:>10}  {result['solver']:<14}"
+              f"{result['iterations']:>10}{result['seconds']:>10.4f}{result['peak_memory'] / 2 ** 20:>10.2f}"
+              f"{result['error']:>12.2e}")
+
+    # Per-iteration figures go to a CSV file that can be compared across releases
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["corpus", "solver", "iteration", "residual", "seconds", "memory"])
+            for result in results:
+                for iteration, residual, seconds, memory in result["trace"]:
+                    writer.writerow([result["corpus"], result["solver"], iteration, residual, seconds, memory])
+
+
+def scale_free_graph(pages):
+    """
+    Return a LinkGraph of `pages` synthetic pages with power-law link
+    structure, like the corpora written by generate.py.
+    """
+    offsets, targets = power_law_links(pages)
+    return LinkGraph([f"{i}.html" for i in range(pages)], offsets, targets)
+
+
+def measure(name, graph, solver, reference):
+    """
+    Run one solver on a LinkGraph and return its iterations, wall time,
+    peak traced memory, largest error against `reference` and a trace of
+    (iteration, residual, seconds, memory) for every iteration.
+
+    Tracing memory slows down pure Python solvers far more than NumPy
+    ones, so the solver is timed in one run and its memory traced in a
+    second run.
+    """
+    trace = []
+    start = time.perf_counter()
+
+    def monitor(iteration, residual):
+        trace.append((iteration, residual, time.perf_counter() - start))
+
+    rank = SOLVERS[solver](graph, DAMPING, TOLERANCE, monitor)
+    seconds = time.perf_counter() - start
+
+    memory_trace = []
+
+    def traced_monitor(iteration, residual):
+        memory_trace.append(tracemalloc.get_traced_memory()[0])
+
+    tracemalloc.start()
+    SOLVERS[solver](graph, DAMPING, TOLERANCE, traced_monitor)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "corpus": name,
+        "pages": len(graph.pages),
+        "links": len(graph.targets),
+        "solver": solver,
+        "iterations": len(trace),
+        "seconds": seconds,
+        "peak_memory": peak_memory,
+        "error": np.abs(rank - reference).max(),
+        "trace": [step + (memory,) for step, memory in zip(trace, memory_trace)]
+    }
+
+
+def power(graph, damping_factor, tolerance, monitor):
+    """
+    Return ranks from pagerank's power iteration, which spreads the rank
+    of pages with no links over every page on every iteration.
+    """
+    return power_iteration(graph, damping_factor, tolerance, monitor=monitor)[0]
+
+
+def jacobi(graph, damping_factor, tolerance, monitor):
+    """
+    Return ranks from Jacobi iteration on the linear system
+    (I - damping_factor * links) x = (1 - damping_factor) / N,
+    normalized at the end, which leaves pages with no links out of the sweeps.
+    """
+    n = len(graph.pages)
+    out_degree = np.diff(graph.offsets)
+    sources = np.repeat(np.arange(n), out_degree)
+    link_share = 1 / out_degree[sources]
+
+    rank = np.full(n, 1 / n)
+    iteration = 0
+    while True:
+        iteration += 1
+        new_rank = (1 - damping_factor) / n + damping_factor * np.bincount(
+            graph.targets, weights=rank[sources] * link_share, minlength=n
+        )
+        change = np.abs(new_rank - rank).max()
+        rank = new_rank
+        monitor(iteration, change)
+        if change <= tolerance:
+            return rank / rank.sum()
+
+
+def gauss_seidel(graph, damping_factor, tolerance, monitor):
+    """
+    Return ranks from Gauss-Seidel sweeps that update each page in place,
+    like the original nested loop, with pages with no links linking to every
+    page. Sweeps are inherently sequential, so they run in plain Python.
+    """
+    n = len(graph.pages)
+    out_degree = np.diff(graph.offsets)
+    sources = np.repeat(np.arange(n), out_degree)
+    dangling = np.flatnonzero(out_degree == 0).tolist()
+
+    # Incoming links of page i are in_sources[in_offsets[i]:in_offsets[i + 1]]
+    order = np.argsort(graph.targets, kind="stable")
+    in_sources = sources[order].tolist()
+    in_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(graph.targets, minlength=n), out=in_offsets[1:])
+    in_offsets = in_offsets.tolist()
+    share = (1 / np.maximum(out_degree, 1)).tolist()
+
+    rank = [1 / n] * n
+    dangling_rank = sum(rank[j] for j in dangling)
+    is_dangling = set(dangling)
+    iteration = 0
+    while True:
+        iteration += 1
+        change = 0
+        for i in range(n):
+            links = sum(rank[j] * share[j] for j in in_sources[in_offsets[i]:in_offsets[i + 1]])
+            value = (1 - damping_factor) / n + damping_factor * (links + dangling_rank / n)
+            if i in is_dangling:
+                dangling_rank += value - rank[i]
+            change = max(change, abs(value - rank[i]))
+            rank[i] = value
+        monitor(iteration, change)
+        if change <= tolerance:
+            rank = np.array(rank)
+            return rank / rank.sum()
+
+
+def sampling(graph, damping_factor, tolerance, monitor):
+    """
+    Return ranks estimated from SAMPLE_SIZE random-walk samples, recorded
+    as a single iteration whose residual is not measured.
+    """
+    counts = sample_counts(graph, damping_factor, SAMPLE_SIZE, np.random.default_rng(0))
+    monitor(1, float("nan"))
+    return counts / SAMPLE_SIZE
+
+
+SOLVERS = {
+    "power": power,
+    "jacobi": jacobi,
+    "gauss-seidel": gauss_seidel,
+    "sampling": sampling
+}
+
+
+if __name__ == "__main__":
+    main()
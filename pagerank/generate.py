@@ -0,0 +1,84 @@
+import os
+import sys
+
+import numpy as np
+
+# Average number of links per page, and the exponent of the in-degree power law
+LINKS_PER_PAGE = 8
+EXPONENT = 1.1
+
+# Pages have the same layout as the pages of the shipped corpora
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{name}</title>
+    </head>
+    <body>
+        <h1>{name}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}        </ul>
+    </body>
+</html>
+"""
+LINK = """            <li><a href="{target}.html">{target}</a></li>\n"""
+
+
+def main():
+    if len(sys.argv) not in [3, 4, 5]:
+        sys.exit("Usage: python generate.py directory pages [links] [seed]")
+    directory = sys.argv[1]
+    pages = int(sys.argv[2])
+    links = float(sys.argv[3]) if len(sys.argv) >= 4 else LINKS_PER_PAGE
+    seed = int(sys.argv[4]) if len(sys.argv) == 5 else 0
+
+    count = generate_corpus(directory, pages, links, seed=seed)
+    print(f"Wrote {pages} pages with {count} links to {directory}")
+
+
+def power_law_links(pages, links=LINKS_PER_PAGE, exponent=EXPONENT, seed=0):
+    """
+    Return the links of `pages` synthetic pages as compressed sparse rows:
+    the targets of page i are targets[offsets[i]:offsets[i + 1]].
+
+    Each page links to about `links` distinct other pages, picked with
+    weights that fall off with their rank in a random order raised to
+    `exponent`, so the numbers of incoming links follow a power law.
+    """
+    rng = np.random.default_rng(seed)
+    popularity = rng.permutation(pages)
+    cumulative = np.cumsum(1 / np.arange(1, pages + 1) ** exponent)
+    cumulative /= cumulative[-1]
+
+    # Pick every link at once, then drop links to self and repeated links
+    counts = np.minimum(rng.exponential(links, size=pages).astype(np.int64), pages - 1)
+    sources = np.repeat(np.arange(pages), counts)
+    picks = np.minimum(np.searchsorted(cumulative, rng.random(len(sources))), pages - 1)
+    targets = popularity[picks]
+    keep = targets != sources
+    pairs = np.unique(sources[keep] * pages + targets[keep])
+    sources, targets = pairs // pages, pairs % pages
+
+    offsets = np.zeros(pages + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=pages), out=offsets[1:])
+    return offsets, targets
+
+
+def generate_corpus(directory, pages, links=LINKS_PER_PAGE, exponent=EXPONENT, seed=0):
+    """
+    Write a corpus of `pages` HTML pages, named 0.html, 1.html and so on,
+    with power-law link structure to `directory`, and return the number
+    of links written.
+    """
+    offsets, targets = power_law_links(pages, links, exponent, seed)
+    os.makedirs(directory, exist_ok=True)
+    for page in range(pages):
+        body = "".join(LINK.format(target=target) for target in targets[offsets[page]:offsets[page + 1]].tolist())
+        with open(os.path.join(directory, f"{page}.html"), "w", encoding="utf-8") as f:
+            f.write(PAGE.format(name=page, links=body))
+    return len(targets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import os
+import sys
+import tempfile
+import time
+from array import array
+
+import numpy as np
+
+from pagerank import DAMPING, TOLERANCE, crawl, link_graph, load_index, parse_files, power_iteration
+
+# Memory allowed for solving, in bytes, when no cap is given
+MEMORY_CAP = 256 * 2 ** 20
+
+# Bytes held per link while a chunk of links is read and summed: its
+# source and target, the source's share of rank and the bincount weights
+BYTES_PER_LINK = 32
+
+# Vectors of one value per page held at once: the old and new ranks, the
+# weighted ranks and the pages with links, or the in- and out-degrees
+VECTORS = 4
+
+# The results check solves both ways to this tolerance, and fails if any
+# page's rank differs by more than MATCH relative to its in-memory value
+CHECK_TOLERANCE = 1e-12
+MATCH = 1e-9
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python outofcore.py corpus [memory_mb]")
+    directory = sys.argv[1]
+    memory_cap = int(sys.argv[2]) * 2 ** 20 if len(sys.argv) == 3 else MEMORY_CAP
+
+    # Solve out of core first, then in memory, and check that the results match
+    start = time.perf_counter()
+    try:
+        ranks = iterate_pagerank_out_of_core(directory, DAMPING, memory_cap, CHECK_TOLERANCE)
+    except ValueError as e:
+        sys.exit(str(e))
+    out_of_core = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = link_graph(crawl(directory))
+    expected = power_iteration(graph, DAMPING, CHECK_TOLERANCE)[0]
+    in_memory = time.perf_counter() - start
+
+    error = max(abs(ranks[page] - rank) / rank for page, rank in zip(graph.pages, expected.tolist()))
+    print(f"Out of core: {out_of_core:.3f}s, in memory: {in_memory:.3f}s, "
+          f"largest relative difference: {error:.2e}")
+    if error > MATCH:
+        sys.exit("Results do not match.")
+
+
+def iterate_pagerank_out_of_core(directory, damping_factor, memory_cap=MEMORY_CAP, tolerance=TOLERANCE, workdir=None):
+    """
+    Return PageRank values for each page of the corpus in `directory`
+    like `iterate_pagerank`, without ever holding its links in memory.
+
+    Links are read from the corpus's link index when it is up to date,
+    and otherwise parsed from the HTML files one at a time. They are
+    partitioned into memory-mapped block files by the page they lead to,
+    and every iteration streams over the blocks, so only the page names,
+    a few vectors of one value per page and one chunk of links are held
+    in memory, within `memory_cap` bytes. Block files are written to
+    `workdir`, or to a temporary directory.
+    """
+    if workdir is None:
+        with tempfile.TemporaryDirectory() as workdir:
+            return iterate_pagerank_out_of_core(directory, damping_factor, memory_cap, tolerance, workdir)
+
+    pages, blocks = partition_links(directory, workdir, memory_cap)
+    n = len(pages)
+    share = np.load(os.path.join(workdir, "share.npy"), mmap_mode="r")
+
+    rank = np.full(n, 1 / n)
+    while True:
+        # Each link carries an equal share of its source page's rank,
+        # and pages with no links spread their rank over every page
+        weighted = rank * share
+        dangling_rank = rank.sum() - rank[share != 0].sum()
+
+        new_rank = np.empty(n)
+        for first, last, chunk_links, links in blocks:
+            incoming = np.zeros(last - first)
+            for start in range(0, len(links), chunk_links):
+                chunk = np.asarray(links[start:start + chunk_links])
+                incoming += np.bincount(chunk[:, 1] - first, weights=weighted[chunk[:, 0]], minlength=last - first)
+            new_rank[first:last] = incoming
+        new_rank = (1 - damping_factor) / n + damping_factor * (new_rank + dangling_rank / n)
+
+        change = np.abs(new_rank - rank).max()
+        rank = new_rank
+        if change <= tolerance:
+            break
+
+    return dict(zip(pages, (rank / rank.sum()).tolist()))
+
+
+def partition_links(directory, workdir, memory_cap):
+    """
+    Write the links between the pages of the corpus in `directory` to
+    block files in `workdir`, each block holding the links into a
+    contiguous range of pages with, where possible, few enough links to be
+    read in one chunk within `memory_cap`. Also write every page's share of
+    rank per link, 1 / (number of links), or 0 for pages with no links.
+
+    Return the page names, numbered by position, and a list of
+    (first page, last page + 1, links per chunk, links) for every block,
+    where links is a memory-mapped array of (source, target) rows.
+    """
+    # Links first go to a single file in the order they are read
+    unsorted = os.path.join(workdir, "links")
+    with open(unsorted, "wb") as f:
+        pages, chunk_links, in_degree, out_degree = write_links(directory, f, memory_cap)
+    n = len(pages)
+    np.save(os.path.join(workdir, "share.npy"), np.divide(1, out_degree, out=np.zeros(n), where=out_degree != 0))
+    del out_degree
+
+    # A block ends before the page whose links would take it over `chunk_links`,
+    # unless that page's links do not fit in a block on their own
+    boundaries = [0]
+    incoming = np.cumsum(in_degree)
+    del in_degree
+    while boundaries[-1] < n:
+        first = boundaries[-1]
+        before = incoming[first - 1] if first else 0
+        last = int(np.searchsorted(incoming, before + chunk_links, side="right"))
+        boundaries.append(min(n, max(last, first + 1)))
+    del incoming
+
+    # The links are then read a chunk at a time and appended to the files of their blocks
+    count = os.path.getsize(unsorted) // 16
+    links = np.memmap(unsorted, dtype=np.int64, mode="r", shape=(count, 2)) if count else np.zeros((0, 2), dtype=np.int64)
+    files = [open(os.path.join(workdir, f"block{i}.links"), "wb") for i in range(len(boundaries) - 1)]
+    try:
+        for start in range(0, count, chunk_links):
+            write_blocks(np.asarray(links[start:start + chunk_links]), boundaries, files)
+    finally:
+        for f in files:
+            f.close()
+    del links
+    os.remove(unsorted)
+
+    blocks = []
+    for i, f in enumerate(files):
+        count = os.path.getsize(f.name) // 16
+        links = np.memmap(f.name, dtype=np.int64, mode="r", shape=(count, 2)) if count else np.zeros((0, 2), dtype=np.int64)
+        blocks.append((boundaries[i], boundaries[i + 1], chunk_links, links))
+    return pages, blocks
+
+
+def write_links(directory, f, memory_cap):
+    """
+    Write every link between two different pages of the corpus in
+    `directory` to the file object `f` as (source, target) rows of page
+    numbers, reading them from the link index if it is up to date and
+    parsing the HTML files otherwise.
+
+    Return the page names, the number of links that fit in one chunk once
+    the page names and vectors are counted against `memory_cap`, and the
+    number of links into and out of every page.
+    """
+    filenames = [filename for filename in os.listdir(directory) if filename.endswith(".html")]
+    index = load_index(directory)
+    if index is not None and not index_is_current(directory, index, filenames):
+        index = None
+
+    # With an index, pages are numbered like its rows, which come first among its names
+    # Without one, page numbers are looked up by name as each file is parsed
+    numbers = None
+    if index is not None:
+        pages = index["names"][:len(index["files"])]
+        del index["names"], index["files"]
+    else:
+        pages = filenames
+        numbers = {page: i for i, page in enumerate(pages)}
+    n = len(pages)
+
+    # The page names and their numbers are the only per-page Python objects kept in memory
+    names_size = sys.getsizeof(pages) + sum(sys.getsizeof(page) for page in pages)
+    if numbers is not None:
+        names_size += sys.getsizeof(numbers)
+    chunk_links = (memory_cap - names_size - VECTORS * n * 8) // BYTES_PER_LINK
+    if chunk_links < 1:
+        raise ValueError(f"A memory cap of {memory_cap} bytes cannot hold the page names and vectors of {n} pages")
+
+    in_degree = np.zeros(n, dtype=np.int64)
+    out_degree = np.zeros(n, dtype=np.int64)
+
+    def flush(sources, targets):
+        if len(sources):
+            np.column_stack([sources, targets]).tofile(f)
+            in_degree[:] += np.bincount(targets, minlength=n)
+            out_degree[:] += np.bincount(sources, minlength=n)
+
+    if index is not None:
+        # Links to pages outside the corpus have ids past its pages
+        offsets, targets = index["offsets"], index["targets"]
+        row = 0
+        while row < n:
+            last = int(np.searchsorted(offsets, offsets[row] + chunk_links, side="right")) - 1
+            last = min(n, max(last, row + 1))
+            chunk = np.asarray(targets[offsets[row]:offsets[last]])
+            sources = np.repeat(np.arange(row, last), np.diff(offsets[row:last + 1]))
+            keep = (chunk < n) & (chunk != sources)
+            flush(sources[keep], chunk[keep])
+            row = last
+        return pages, chunk_links, in_degree, out_degree
+
+    sources, targets = array("q"), array("q")
+    paths = (os.path.join(directory, page) for page in pages)
+    for filename, links, size in parse_files(paths):
+        source = numbers[filename]
+        for link in links:
+            target = numbers.get(link)
+            if target is not None and target != source:
+                sources.append(source)
+                targets.append(target)
+        if len(sources) >= chunk_links:
+            flush(np.frombuffer(sources, dtype=np.int64), np.frombuffer(targets, dtype=np.int64))
+            sources, targets = array("q"), array("q")
+    flush(np.frombuffer(sources, dtype=np.int64), np.frombuffer(targets, dtype=np.int64))
+    return pages, chunk_links, in_degree, out_degree
+
+
+def index_is_current(directory, index, filenames):
+    """
+    Return whether the link index lists exactly the HTML files in
+    `directory`, none of which have changed since it was written.
+    """
+    if len(index["files"]) != len(filenames):
+        return False
+    for filename in filenames:
+        if filename not in index["files"]:
+            return False
+        row, mtime, size = index["files"][filename]
+        stat = os.stat(os.path.join(directory, filename))
+        if mtime != stat.st_mtime_ns or size != stat.st_size:
+            return False
+    return True
+
+
+def write_blocks(links, boundaries, files):
+    """
+    Append (source, target) rows of `links` to the files of the blocks
+    their targets fall in.
+    """
+    if not len(links):
+        return
+    block = np.searchsorted(boundaries, links[:, 1], side="right") - 1
+    order = np.argsort(block, kind="stable")
+    links, block = links[order], block[order]
+    cuts = np.searchsorted(block, np.arange(len(files) + 1))
+    for i, f in enumerate(files):
+        links[cuts[i]:cuts[i + 1]].tofile(f)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,57 @@
+import json
+import multiprocessing
 import os
-import random
 import re
 import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
 
 DAMPING = 0.85
 SAMPLES = 10000
+TOLERANCE = 0.001
+
+# Number of random walkers sampling at once, how many steps each takes before
+# its samples count, and how many steps are buffered before being counted
+WALKERS = 10000
+BURN_IN = 50
+COUNT_EVERY = 100
+
+# Number of seed sets solved together by personalized_pagerank
+SEED_BATCH = 64
+
+# Without SciPy, a block of ranks is stepped by summing the ranks linking to
+# up to this many links' worth of pages with the same number of incoming links,
+# or a column at a time for blocks narrower than this many columns
+PIECE_LINKS = 2048
+NARROW_BLOCK = 16
+
+# Link index kept in each corpus directory so unchanged files are not parsed again
+INDEX_DIRECTORY = ".linkindex"
+INDEX_VERSION = 2
+
+# Links are found in HTML files read this many bytes at a time
+CHUNK_SIZE = 1 << 16
+LINK_PATTERN = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# A corpus with pages numbered by their position in `pages`, and its links
+# as compressed sparse rows over those numbers
+LinkGraph = namedtuple("LinkGraph", ["pages", "offsets", "targets"])
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python pagerank.py corpus [processes]")
+    processes = int(sys.argv[2]) if len(sys.argv) == 3 else 1
+    corpus, stats = timed_crawl(sys.argv[1], processes)
+    print(f"Crawled {stats['pages']} pages, parsing {stats['parsed']} ({stats['bytes']} bytes), "
+          f"at {stats['pages_per_second']:.0f} pages/s")
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
@@ -21,22 +62,51 @@ def main():
         print(f"  {page}: {ranks[page]:.4f}")
 
 
-def crawl(directory):
+def crawl(directory, processes=1, use_index=True):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
+
+    With more than one process, files are parsed in a pool of that many
+    worker processes. Unless `use_index` is False, links are kept in a
+    link index in the directory, and only files changed since are parsed.
     """
-    pages = dict()
+    return timed_crawl(directory, processes, use_index)[0]
+
 
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+def timed_crawl(directory, processes=1, use_index=True):
+    """
+    Crawl a directory like `crawl`, returning the pages and a dictionary
+    of the pages found, files parsed, bytes read, seconds taken and
+    pages per second.
+    """
+    start = time.perf_counter()
+    pages = dict()
+    total_bytes = 0
+
+    # Take links from the index for files unchanged since it was written
+    files = {
+        filename: os.stat(os.path.join(directory, filename))
+        for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    }
+    index = load_index(directory) if use_index else None
+    stale = []
+    for filename, stat in files.items():
+        links = indexed_links(index, filename, stat)
+        if links is None:
+            stale.append(os.path.join(directory, filename))
+        else:
+            pages[filename] = links
+
+    # Extract all links from the other HTML files
+    for filename, links, size in parse_files(stale, processes):
+        pages[filename] = links - {filename}
+        total_bytes += size
+
+    if use_index and (index is None or stale or len(index["files"]) != len(files)):
+        save_index(directory, pages, files)
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -45,7 +115,147 @@ def crawl(directory):
             if link in pages
         )
 
-    return pages
+    seconds = time.perf_counter() - start
+    return pages, {
+        "pages": len(pages),
+        "parsed": len(stale),
+        "bytes": total_bytes,
+        "seconds": seconds,
+        "pages_per_second": len(pages) / seconds if seconds else 0
+    }
+
+
+def load_index(directory):
+    """
+    Return the link index of a directory, with its offsets and targets
+    memory-mapped, or None if there is no usable index.
+    """
+    path = os.path.join(directory, INDEX_DIRECTORY)
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        index["offsets"] = np.load(os.path.join(path, f"offsets.{index['arrays']}.npy"), mmap_mode="r")
+        index["targets"] = np.load(os.path.join(path, f"targets.{index['arrays']}.npy"), mmap_mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # Arrays left over from an interrupted write do not match the metadata
+    if index.get("version") != INDEX_VERSION or len(index["targets"]) != index["links"]:
+        return None
+    return index
+
+
+def indexed_links(index, filename, stat):
+    """
+    Return the links of a file from the index, or None if the file
+    is not in the index or has changed since it was indexed.
+    """
+    if index is None or filename not in index["files"]:
+        return None
+    row, mtime, size = index["files"][filename]
+    if mtime != stat.st_mtime_ns or size != stat.st_size:
+        return None
+
+    names = index["names"]
+    targets = index["targets"][index["offsets"][row]:index["offsets"][row + 1]]
+    return set(names[target] for target in targets.tolist())
+
+
+def save_index(directory, pages, files):
+    """
+    Write the link index of a directory: every page's links, including
+    links to pages outside the corpus, as compressed sparse rows over
+    integer ids, along with the id of every name and each file's mtime and size.
+    A directory that cannot be written to is left without an index.
+    """
+    # Pages take the first ids, then any other link targets
+    names = list(pages)
+    ids = {name: i for i, name in enumerate(names)}
+    for links in pages.values():
+        for link in links:
+            if link not in ids:
+                ids[link] = len(names)
+                names.append(link)
+
+    offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+    np.cumsum([len(links) for links in pages.values()], out=offsets[1:])
+    targets = np.fromiter(
+        (ids[link] for links in pages.values() for link in links),
+        dtype=np.int64, count=offsets[-1]
+    )
+    meta = {
+        "version": INDEX_VERSION,
+        "names": names,
+        "links": len(targets),
+        "files": {
+            filename: [row, files[filename].st_mtime_ns, files[filename].st_size]
+            for row, filename in enumerate(pages)
+        }
+    }
+
+    # Arrays are written under new names and meta.json, which names them, is swapped
+    # in last, so readers never see a mix of old and new files, and old arrays
+    # that another crawl has memory-mapped are unlinked rather than overwritten
+    path = os.path.join(directory, INDEX_DIRECTORY)
+    meta["arrays"] = f"{os.getpid()}-{time.time_ns()}"
+    temporary = os.path.join(path, f"meta.json.{meta['arrays']}.tmp")
+    try:
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, f"offsets.{meta['arrays']}.npy"), offsets)
+        np.save(os.path.join(path, f"targets.{meta['arrays']}.npy"), targets)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temporary, os.path.join(path, "meta.json"))
+    except OSError:
+        return
+
+    # Remove arrays of earlier indexes
+    for filename in os.listdir(path):
+        if filename.endswith(".npy") and f".{meta['arrays']}." not in filename:
+            try:
+                os.remove(os.path.join(path, filename))
+            except OSError:
+                pass
+
+
+def parse_files(paths, processes=1):
+    """
+    Yield the result of extract_links for every path, in any order,
+    using a pool of worker processes if `processes` is more than one.
+    """
+    if processes == 1:
+        yield from map(extract_links, paths)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(extract_links, paths, chunksize=max(1, len(paths) // (processes * 4)))
+
+
+def extract_links(path):
+    """
+    Return the file name of an HTML file, the set of links in it and
+    the number of bytes read, reading the file in chunks rather than whole.
+    """
+    links = set()
+    size = 0
+    pending = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            text = pending + chunk
+
+            # A tag cut off at the end of the chunk is carried over to the next one
+            cut = text.rfind(b"<")
+            if cut != -1 and text.find(b">", cut) == -1:
+                text, pending = text[:cut], text[cut:]
+            else:
+                pending = b""
+            links.update(LINK_PATTERN.findall(text))
+    links.update(LINK_PATTERN.findall(pending))
+
+    return os.path.basename(path), set(link.decode() for link in links), size
 
 
 def transition_model(corpus, page, damping_factor):
@@ -88,115 +298,324 @@ def transition_model(corpus, page, damping_factor):
     return page_probabilities
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, seed=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
 
+    The samples are taken by many independent random walkers at once,
+    using a random generator seeded with `seed`.
+
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    # Initialize a dictionary that will store the number of times a page was chosen as a sample
-    pages_samples = dict()
+    graph = link_graph(corpus)
+    counts = sample_counts(graph, damping_factor, n, np.random.default_rng(seed))
+    return dict(zip(graph.pages, (counts / n).tolist()))
 
-    # Copy page names from corpus to the new dictionary
-    for key in corpus:
-        pages_samples[key] = 0
 
-    # Initialize current page, at first, pick a random key from the corpus
-    current_page = random.choice(list(corpus))
-    pages_samples[current_page] += 1
+def sample_counts(graph, damping_factor, n, rng):
+    """
+    Return how many of `n` samples landed on each page of a LinkGraph,
+    taken by up to WALKERS random walkers that each start on a random page.
+
+    Walkers take BURN_IN steps before sampling, so that the many random
+    starting pages do not pull the estimate towards a uniform distribution.
+    """
+    pages = len(graph.pages)
+    out_degree = np.diff(graph.offsets)
+    counts = np.zeros(pages, dtype=np.int64)
+
+    # Visited pages are buffered and counted together every few steps
+    visited = []
+    taken = 0
+    current = rng.integers(pages, size=min(n, WALKERS))
+    for i in range(BURN_IN):
+        current = walk(graph, out_degree, current, damping_factor, rng)
+
+    while True:
+        step = current[:n - taken]
+        visited.append(step)
+        taken += len(step)
+        if taken >= n or len(visited) == COUNT_EVERY:
+            counts += np.bincount(np.concatenate(visited), minlength=pages)
+            visited = []
+        if taken >= n:
+            return counts
+        current = walk(graph, out_degree, current, damping_factor, rng)
+
+
+def walk(graph, out_degree, current, damping_factor, rng):
+    """
+    Return the next page of every walker on the pages in `current`.
 
-    # Keep track of the number of samples
-    number_of_samples = 1
+    With probability `damping_factor` a walker follows a random link
+    from its page, and otherwise, or if the page has no links, it moves
+    to a random page from the whole corpus.
+    """
+    degree = out_degree[current]
+    follow = (rng.random(len(current)) < damping_factor) & (degree > 0)
 
-    # Create samples until n is reached
-    while number_of_samples < n:
+    next_pages = rng.integers(len(graph.pages), size=len(current))
+    links = graph.offsets[current[follow]] + rng.integers(degree[follow])
+    next_pages[follow] = graph.targets[links]
+    return next_pages
 
-        # Calculate the probabilities for the next page using the transition model function
-        next_page_probabilities = transition_model(corpus, current_page, damping_factor)
 
-        # Pick the next page (the new current page) based on the probabilities
-        # The parameters to the choices function are 1) list of pages to choose from,
-        # 2) the weights or probabilities when making the choice, 2) the number of values to choose (1)
-        current_page = random.choices(list(next_page_probabilities),
-                                      weights=list(next_page_probabilities.values()), k=1)[0]
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page by iteratively updating
+    PageRank values until no value changes by more than `tolerance`.
 
-        # Update the pages_samples dictionary by increasing the times a page was chosen by 1
-        for page in pages_samples:
-            if page == current_page:
-                pages_samples[page] += 1
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = link_graph(corpus)
+    rank, iterations = power_iteration(graph, damping_factor, tolerance)
+    return dict(zip(graph.pages, rank.tolist()))
 
-        # Update the number of samples
-        number_of_samples += 1
 
-    # Initialize a dictionary that will store the pages of the corpus with their PageRank values
-    page_rank_values = dict()
+def link_graph(corpus):
+    """
+    Return the corpus as a LinkGraph: its pages in sorted order, and the
+    links between them as compressed sparse rows, where the pages linked
+    to by page i are targets[offsets[i]:offsets[i + 1]].
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
 
-    # Calculate PageRanks
-    for key in corpus:
-        page_rank_values[key] = pages_samples[key] / n
+    out_degree = np.fromiter((len(corpus[page]) for page in pages), dtype=np.int64, count=len(pages))
+    offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+    np.cumsum(out_degree, out=offsets[1:])
+    targets = np.fromiter(
+        (index[link] for page in pages for link in corpus[page]),
+        dtype=np.int64, count=offsets[-1]
+    )
+    return LinkGraph(pages, offsets, targets)
 
-    return page_rank_values
 
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE, rank=None, monitor=None):
+    """
+    Return the PageRank vector of a LinkGraph, indexed like graph.pages,
+    and the number of iterations taken for no value to change by more
+    than `tolerance`, starting from the vector `rank` if one is given
+    and from a uniform distribution otherwise.
 
-def iterate_pagerank(corpus, damping_factor):
+    If given, `monitor` is called with the iteration number and the
+    largest change after every iteration.
     """
-    Return PageRank values for each page by iteratively updating
-    PageRank values until convergence.
+    n = len(graph.pages)
+    out_degree = np.diff(graph.offsets)
+    sources = np.repeat(np.arange(n), out_degree)
+    dangling = out_degree == 0
 
-    Return a dictionary where keys are page names, and values are
-    their estimated PageRank value (a value between 0 and 1). All
-    PageRank values should sum to 1.
+    # Each link carries an equal share of its source page's rank
+    link_share = 1 / out_degree[sources]
+
+    if rank is None:
+        rank = np.full(n, 1 / n)
+    iterations = 0
+    while True:
+        iterations += 1
+
+        # Pages with no links spread their rank over every page in the corpus,
+        # which adds the same amount to every page instead of a dense row per page
+        dangling_rank = rank[dangling].sum()
+        new_rank = np.bincount(graph.targets, weights=rank[sources] * link_share, minlength=n)
+        new_rank = (1 - damping_factor) / n + damping_factor * (new_rank + dangling_rank / n)
+
+        change = np.abs(new_rank - rank).max()
+        rank = new_rank
+        if monitor is not None:
+            monitor(iterations, change)
+        if change <= tolerance:
+            break
+
+    return rank / rank.sum(), iterations
+
+
+def personalized_pagerank(corpus, damping_factor, seeds, tolerance=TOLERANCE):
     """
+    Return a list with one dictionary of PageRank values for each set of
+    pages in `seeds`, where the random surfer, instead of moving to any page
+    of the corpus, moves to a random page of the seed set. Pages with no
+    links also lead to the seed set.
 
-    # Initialize a dictionary that will store the pages of the corpus with their PageRank values
-    page_rank_values = dict()
+    Seed sets are solved SEED_BATCH at a time, as the rows of one matrix.
+    """
+    graph = link_graph(corpus)
+    index = {page: i for i, page in enumerate(graph.pages)}
+    seeds = list(seeds)
 
-    # At first, set each page rank to 1 / nr of pages in total
-    for key in corpus:
-        page_rank_values[key] = 1 / len(corpus)
+    ranks = []
+    for first in range(0, len(seeds), SEED_BATCH):
+        batch = seeds[first:first + SEED_BATCH]
 
-    # Initialize variable to keep track of how much the pange ranks change
-    max_change = 1
+        # Each row is the teleport distribution of one seed set
+        teleport = np.zeros((len(batch), len(graph.pages)))
+        for row, seed in enumerate(batch):
+            columns = [index[page] for page in seed if page in index]
+            if len(columns) != len(seed) or not columns:
+                raise ValueError("Seed sets must be non-empty sets of pages in the corpus")
+            teleport[row, columns] = 1 / len(columns)
 
-    # Calculate new page ranks until no page rank change is higher than 0.001
-    while max_change > 0.001:
+        rank = batched_power_iteration(graph, damping_factor, teleport, tolerance)
+        for row in rank:
+            ranks.append(dict(zip(graph.pages, row.tolist())))
 
-        max_change = 0
+    return ranks
 
-        for p in page_rank_values:
-            initial_value = page_rank_values[p]
 
-            random_from_all = ((1 - damping_factor) / len(corpus))
-            links_prob = 0
+def batched_power_iteration(graph, damping_factor, teleport, tolerance=TOLERANCE):
+    """
+    Return the PageRank matrix of a LinkGraph for a matrix of teleport
+    distributions, one per row, iterating each row until none of its
+    values changes by more than `tolerance`.
 
-            for i in page_rank_values:
-                # If i has no links, it will have one link for every page in the corpus (including itself)
-                if len(corpus[i]) == 0:
-                    links_prob += page_rank_values[i] * (1 / len(corpus))
+    Every iteration steps the ranks of all seed sets still iterating at
+    once, as the columns of one block, and seed sets that have converged
+    are left out of later iterations.
+    """
+    step = block_step(graph, damping_factor, len(teleport))
+    dangling = np.flatnonzero(np.diff(graph.offsets) == 0)
+
+    # Teleport distributions are usually a few pages each, so only their nonzero values are added
+    seed_rows, seed_pages = np.nonzero(teleport)
+    seed_values = teleport[seed_rows, seed_pages]
+    columns = seed_rows
+
+    rank = np.empty_like(teleport)
+    active = np.arange(len(teleport))
+    block = teleport.T.copy()
+    while len(active):
+        new_block = step(block)
+        teleported = 1 - damping_factor + damping_factor * block[dangling].sum(axis=0)
+        new_block[seed_pages, columns] += teleported[columns] * seed_values
+
+        block -= new_block
+        converged = np.abs(block, out=block).max(axis=0) <= tolerance
+        if converged.any():
+            # Columns are dropped with compress, as boolean indexing of columns copies them slowly
+            rank[active[converged]] = np.compress(converged, new_block, axis=1).T
+            new_block = np.compress(~converged, new_block, axis=1)
+            active = active[~converged]
+            keep = np.isin(seed_rows, active)
+            seed_rows, seed_pages, seed_values = seed_rows[keep], seed_pages[keep], seed_values[keep]
+            columns = np.searchsorted(active, seed_rows)
+        block = new_block
+
+    return rank / rank.sum(axis=1, keepdims=True)
+
+
+def block_step(graph, damping_factor, columns):
+    """
+    Return a function taking a block of ranks, one column per seed set and
+    at most `columns` of them, and returning the damped rank each page receives through its links.
 
-                # Else if i has a link to p, it randomly picks from all links on i:
-                elif p in corpus[i]:
-                    links_prob += page_rank_values[i] / len(corpus[i])
+    With SciPy, this is one sparse matrix product over the block. Without
+    it, pages are grouped by their number of incoming links, so the ranks
+    linking to every page of a group are summed in one gather over the block,
+    unless the block is too narrow for that to beat a bincount per column.
+    """
+    n = len(graph.pages)
+    out_degree = np.diff(graph.offsets)
+    sources = np.repeat(np.arange(n), out_degree)
+    if sparse is not None:
+        matrix = sparse.csr_matrix((damping_factor / out_degree[sources], (graph.targets, sources)), shape=(n, n))
+        return lambda block: matrix @ block
+
+    share = damping_factor * np.divide(1, out_degree, out=np.zeros(n), where=out_degree != 0)[:, None]
+    link_share = share[sources, 0]
+
+    def column_step(block):
+        return np.column_stack([
+            np.bincount(graph.targets, weights=column[sources] * link_share, minlength=n)
+            for column in block.T
+        ])
+
+    if columns < NARROW_BLOCK:
+        return column_step
+
+    in_degree = np.bincount(graph.targets, minlength=n)
+    link_start = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(in_degree, out=link_start[1:])
+
+    # Each piece is a list of pages with the same in-degree, and the
+    # (pages, in-degree) matrix of the pages linking to them
+    by_target = sources[np.argsort(graph.targets, kind="stable")]
+    pages = np.argsort(in_degree, kind="stable")
+    sorted_degree = in_degree[pages]
+    first = int(np.searchsorted(sorted_degree, 1))
+    pieces = []
+    while first < n:
+        degree = sorted_degree[first]
+        last = int(np.searchsorted(sorted_degree, degree, side="right"))
+        last = min(last, first + max(1, PIECE_LINKS // degree))
+        rows = pages[first:last]
+        pieces.append((rows, by_target[link_start[rows][:, None] + np.arange(degree)]))
+        first = last
+
+    def step(block):
+        if block.shape[1] < NARROW_BLOCK:
+            return column_step(block)
+
+        weighted = block * share
+        incoming = np.zeros_like(block)
+        for rows, links in pieces:
+            incoming[rows] = weighted[links].sum(axis=1)
+        return incoming
+
+    return step
+
+
+def update_pagerank(corpus, ranks, changes, damping_factor, tolerance=TOLERANCE, compare=False):
+    """
+    Return the corpus with `changes` applied, its PageRank values and a
+    dictionary reporting the iterations taken.
+
+    `changes` maps each added or changed page to its new set of links,
+    and each removed page to None. The iteration starts from the previous
+    `ranks`, which are close to the new ones when few pages change. With
+    `compare`, the report also gives the iterations a uniform start takes
+    and how many were saved.
+    """
+    corpus = apply_changes(corpus, changes)
+    graph = link_graph(corpus)
 
-            page_rank_values[p] = random_from_all + (damping_factor * links_prob)
+    # Pages new to the corpus start from the uniform value
+    n = len(graph.pages)
+    start = np.fromiter((ranks.get(page, 1 / n) for page in graph.pages), dtype=np.float64, count=n)
+    start /= start.sum()
 
-            # See if the change is higher than 0.001
-            change = abs(page_rank_values[p] - initial_value)
-            if change > max_change:
-                max_change = change
+    rank, iterations = power_iteration(graph, damping_factor, tolerance, start)
+    report = {"iterations": iterations}
+    if compare:
+        cold_iterations = power_iteration(graph, damping_factor, tolerance)[1]
+        report["cold_iterations"] = cold_iterations
+        report["saved"] = cold_iterations - iterations
 
-    # Normalize the page ranks
-    sum = 0
-    for value in page_rank_values.values():
-        sum += value
+    return corpus, dict(zip(graph.pages, rank.tolist())), report
 
-    for page, value in page_rank_values.items():
-        page_rank_values[page] = value / sum
 
-    return page_rank_values
+def apply_changes(corpus, changes):
+    """
+    Return a new corpus with the pages in `changes` replaced by their new
+    links, or removed where mapped to None, keeping only links to pages
+    that are still in the corpus.
+    """
+    pages = dict(corpus)
+    for page, links in changes.items():
+        if links is None:
+            pages.pop(page, None)
+        else:
+            pages[page] = set(links) - {page}
+
+    return {
+        page: set(link for link in links if link in pages)
+        for page, links in pages.items()
+    }
 
 
 if __name__ == "__main__":
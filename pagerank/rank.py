@@ -0,0 +1,69 @@
+import csv
+import heapq
+import json
+import sys
+
+from pagerank import DAMPING, crawl, link_graph, power_iteration
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python rank.py corpus [output.csv|output.jsonl|-] [top]")
+
+    # The output comes first, so the full ranking can be written to a file,
+    # and "-" writes to standard output
+    output = sys.argv[2] if len(sys.argv) >= 3 and sys.argv[2] != "-" else None
+    if output is not None and not output.endswith((".csv", ".jsonl")):
+        sys.exit("Output file must end in .csv or .jsonl")
+    try:
+        top = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    except ValueError:
+        sys.exit("top must be a number of pages")
+
+    # Only the exact solution is computed; the sampling estimator is skipped
+    graph = link_graph(crawl(sys.argv[1]))
+    rank = power_iteration(graph, DAMPING)[0]
+    results = ranked_pages(graph.pages, rank.tolist(), top)
+
+    if output is None:
+        write_csv(results, sys.stdout)
+    else:
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            if output.endswith(".jsonl"):
+                write_jsonl(results, f)
+            else:
+                write_csv(results, f)
+
+
+def ranked_pages(pages, ranks, top=None):
+    """
+    Return (page, rank) pairs for the `top` highest ranked pages, highest
+    first, found with a heap of `top` pages rather than a full sort.
+    Without `top`, return an iterator over every page in corpus order.
+    """
+    if top is None:
+        return zip(pages, ranks)
+    best = heapq.nlargest(top, zip(ranks, pages))
+    return [(page, rank) for rank, page in best]
+
+
+def write_csv(results, f):
+    """
+    Write (page, rank) pairs to the file object `f` as CSV rows, one at a time.
+    """
+    writer = csv.writer(f)
+    writer.writerow(["page", "rank"])
+    for page, rank in results:
+        writer.writerow([page, rank])
+
+
+def write_jsonl(results, f):
+    """
+    Write (page, rank) pairs to the file object `f` as JSON lines, one at a time.
+    """
+    for page, rank in results:
+        f.write(json.dumps({"page": page, "rank": rank}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import csv
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from generate import generate_corpus
+from pagerank import DAMPING, INDEX_DIRECTORY, SAMPLES, crawl, iterate_pagerank, sample_pagerank
+
+# Numbers of pages in the synthetic corpora, when no sizes are given
+SIZES = [1000, 10000, 100000, 1000000]
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python scaling.py directory [size ...]")
+    directory = sys.argv[1]
+    sizes = [int(size) for size in sys.argv[2:]] or SIZES
+
+    # Each size is run in a fresh process, so its peak memory is its own
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        with context.Pool(1) as pool:
+            results.extend(pool.apply(run_stages, (os.path.join(directory, str(size)), size)))
+
+    print(f"{'pages':>8}  {'stage':<14}{'seconds':>10}{'peak RSS MB':>13}")
+    for result in results:
+        print(f"{result['pages']:>8}  {result['stage']:<14}{result['seconds']:>10.3f}"
+              f"{result['peak_rss'] / 2 ** 20:>13.1f}")
+
+    with open(os.path.join(directory, "scaling.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["pages", "stage", "seconds", "peak_rss"])
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def run_stages(directory, size):
+    """
+    Generate a corpus of `size` pages in `directory`, unless one is already
+    there, then time each stage of pagerank on it. Return one record per
+    stage with the seconds it took and the peak RSS of the process after it.
+    """
+    results = []
+
+    def stage(name, func, *args):
+        start = time.perf_counter()
+        value = func(*args)
+        results.append({
+            "pages": size,
+            "stage": name,
+            "seconds": time.perf_counter() - start,
+            "peak_rss": peak_memory()
+        })
+        return value
+
+    # Generating a million files takes a while, so corpora are kept between runs
+    if not os.path.isdir(directory) or sum(name.endswith(".html") for name in os.listdir(directory)) != size:
+        stage("generate", generate_corpus, directory, size)
+    shutil.rmtree(os.path.join(directory, INDEX_DIRECTORY), ignore_errors=True)
+
+    stage("crawl", crawl, directory)
+    corpus = stage("crawl-indexed", crawl, directory)
+    stage("sample", sample_pagerank, corpus, DAMPING, SAMPLES)
+    stage("iterate", iterate_pagerank, corpus, DAMPING)
+    return results
+
+
+def peak_memory():
+    """
+    Return the peak resident set size of this process in bytes, or 0 where
+    the resource module is not available.
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+if __name__ == "__main__":
+    main()